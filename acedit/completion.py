@@ -0,0 +1,67 @@
+# Shell completion for acedit.
+#
+# The completion functions run on every key press, so they do not start
+# python at all. They read completion.txt from the cache directory, a
+# sorted list of 'site contest problem' lines that is kept up to date
+# whenever problems are stored. Spoj problems have '-' as contest.
+
+index_name = 'completion.txt'
+
+bash = r'''_acedit() {
+    local cur prev index site contest i
+    cur="${COMP_WORDS[COMP_CWORD]}"
+    prev="${COMP_WORDS[COMP_CWORD-1]}"
+    index="$HOME/.cache/ACedIt/%(index)s"
+
+    for ((i = 1; i < COMP_CWORD; i++)); do
+        case "${COMP_WORDS[i]}" in
+            -s|--site) site="${COMP_WORDS[i+1]}" ;;
+            -c|--contest) contest="${COMP_WORDS[i+1]}" ;;
+        esac
+    done
+
+    case "$prev" in
+        -s|--site|--set-default-site)
+            COMPREPLY=($(compgen -W "%(sites)s" -- "$cur"))
+            ;;
+        -c|--contest|--set-default-contest)
+            COMPREPLY=($(compgen -W "$(awk -v s="$site" \
+                '(s == "" || $1 == s) && $2 != "-" && !seen[$2]++ { print $2 }' "$index" 2>/dev/null)" -- "$cur"))
+            ;;
+        -p|--problem)
+            COMPREPLY=($(compgen -W "$(awk -v s="$site" -v c="$contest" \
+                '(s == "" || $1 == s) && (c == "" || $2 == c) && !seen[$3]++ { print $3 }' "$index" 2>/dev/null)" -- "$cur"))
+            ;;
+        --run|--interactor)
+            compopt -o filenames 2>/dev/null
+            COMPREPLY=($(compgen -d -- "$cur")
+                       $(compgen -f -- "$cur" | grep -E '\.(%(extensions)s)$'))
+            ;;
+        --export-cache|--import-cache)
+            compopt -o filenames 2>/dev/null
+            COMPREPLY=($(compgen -f -- "$cur"))
+            ;;
+        *)
+            if [[ "$cur" == -* ]]; then
+                COMPREPLY=($(compgen -W "%(options)s" -- "$cur"))
+            fi
+            ;;
+    esac
+}
+complete -F _acedit acedit
+'''
+
+zsh = r'''(( $+functions[compdef] )) || { autoload -U compinit && compinit }
+autoload -U bashcompinit && bashcompinit
+''' + bash
+
+
+def get_script(shell, sites, extensions, options):
+    """
+    Method to get the completion script for a shell
+    """
+    script = bash if shell == 'bash' else zsh
+    return script % {'index': index_name,
+                     'sites': ' '.join(sites),
+                     'extensions': '|'.join(extensions),
+                     'options': ' '.join(options)}
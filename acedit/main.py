@@ -13,10 +13,10 @@ def validate_args(args):
     if args['default_site'] is not None or args['default_contest'] is not None:
         return
 
-    if args['clear_cache']:
+    if args['clear_cache'] or args['search'] or args['export_cache'] or args['import_cache'] or args['serve']:
         return
 
-    if args['add_test'] and (not args['contest'] and args['site'] != 'spoj' or not args['problem']):
+    if (args['add_test'] or args['import_tests']) and (not args['contest'] and args['site'] != 'spoj' or not args['problem']):
         print('Please specify contest and problem code')
         sys.exit(0)
 
@@ -24,9 +24,29 @@ def validate_args(args):
         print('Please specify contest code or set a default contest.')
         sys.exit(0)
 
+    if args['repeat'] is not None and args['repeat'] < 1:
+        print('Please specify at least 1 run for --repeat.')
+        sys.exit(0)
+
+    if args['warmup'] < 0:
+        print('Please specify a non-negative number of warmup runs.')
+        sys.exit(0)
+
+    if args['repeat'] is not None and args['pin'] is not None:
+        if args['pin'] < 0:
+            print('Please specify a valid CPU number to pin to.')
+            sys.exit(0)
+        if util.Utilities.find_executable('taskset') is None:
+            print('Pinning to a CPU needs taskset, which was not found in PATH.')
+            sys.exit(0)
+
     if args['source']:
         return
 
+    if args['history'] and args['problem'] is None:
+        print('Please specify a problem code to show history for.')
+        sys.exit(0)
+
     if args['site'] == 'spoj' and args['problem'] is None:
         print('Please specify a problem code for Spoj.')
         sys.exit(0)
@@ -45,6 +65,10 @@ def main():
             # adding test
             util.Utilities.add_test(args)
 
+        elif args['import_tests']:
+            # adding tests from a directory or an archive
+            util.Utilities.import_tests(args)
+
         elif args['default_contest']:
             # set default contest
             util.Utilities.set_constants('default_contest', args['default_contest'])
@@ -53,10 +77,34 @@ def main():
             # clear cached test cases
             util.Utilities.clear_cache(args['site'])
 
+        elif args['serve']:
+            # share the local cache over http
+            util.Utilities.serve(args['port'], supported_sites)
+
+        elif args['export_cache']:
+            # export cached problems into an archive
+            util.Utilities.export_cache(args['export_cache'], args['filter_site'], args['filter_contest'])
+
+        elif args['import_cache']:
+            # merge cached problems from an archive
+            util.Utilities.import_cache(args['import_cache'])
+
+        elif args['search']:
+            # search cached problem statements
+            util.Utilities.search(args['search'])
+
+        elif args['history']:
+            # show timing history of a problem
+            util.Utilities.show_history(args)
+
         elif args['source']:
             # run code
             util.Utilities.run_solution(args)
 
+        elif args['wait_and_fetch']:
+            # download the contest as soon as it starts
+            util.Utilities.wait_and_fetch(args)
+
         elif args['problem'] is not None:
             # fetch single problem
             util.Utilities.download_problem_testcases(args)
@@ -1,11 +1,18 @@
 import sys
+import errno
 import json
 import re
 import os
+import time
+import signal
+import resource
+from contextlib import contextmanager
+from . import completion
 try:
     from bs4 import BeautifulSoup as bs
     import grequests as grq
     import requests as rq
+    from gevent.monkey import get_original
     from argparse import ArgumentParser
 except:
     err = """
@@ -15,6 +22,16 @@ except:
     print(err)
     sys.exit(0)
 
+# grequests monkey patches os.fork and subprocess with gevent versions
+# that only work from the main thread. Solutions are run from worker
+# threads, so processes are started with the original fork
+fork = get_original('os', 'fork')
+
+# Files replaced atomically are created by mkstemp with mode 0600,
+# they get the permissions a plain open would have given them instead
+umask = os.umask(0)
+os.umask(umask)
+
 
 class Utilities:
 
@@ -30,7 +47,56 @@ class Utilities:
         'AC': colors['BOLD'] + colors['GREEN'] + 'AC' + colors['ENDC'],
         'WA': colors['BOLD'] + colors['RED'] + 'WA' + colors['ENDC'],
         'RTE': colors['BOLD'] + colors['RED'] + 'RTE' + colors['ENDC'],
-        'TLE': colors['BOLD'] + colors['YELLOW'] + 'TLE' + colors['ENDC']
+        'TLE': colors['BOLD'] + colors['YELLOW'] + 'TLE' + colors['ENDC'],
+        'MLE': colors['BOLD'] + colors['YELLOW'] + 'MLE' + colors['ENDC'],
+        'FAIL': colors['BOLD'] + colors['RED'] + 'FAIL' + colors['ENDC'],
+        'SKIP': colors['YELLOW'] + 'SKIP' + colors['ENDC']
+    }
+    languages = ['c', 'cpp', 'java', 'py', 'hs', 'rb', 'kt']
+    session = None
+    # Connections kept open to a site for simultaneous requests
+    max_connections = 8
+    # Seconds before a contest starts to open connections to the site
+    warm_up_lead = 30
+    # Seconds after the start of a contest to give up waiting for it
+    wait_timeout = 30 * 60
+    # Limits used when the problem page does not state them
+    time_limit = 2.0
+    memory_limit = None
+    # Interactors get this many times the time limit of the solution
+    interactor_time_factor = 2
+    # Compiler options taking the next token as their value
+    options_with_argument = ['-I', '-D', '-U', '-x', '-isystem', '-iquote', '-idirafter', '-MF', '-MT', '-Xclang']
+    # Files of a problem directory shared by --export-cache
+    exported_files = ['tests.json', 'statement.txt', 'limits.json']
+    out_of_memory_pattern = r'MemoryError|bad_alloc|OutOfMemoryError|[Cc]annot allocate memory|failed to map segment'
+    # A new version is reported as a regression when it is this
+    # much slower than the best previous one on the same tests
+    regression_threshold = 0.2
+    # Toolchains compared by --matrix. {source}, {binary} and {basename}
+    # are substituted before running. Can be overridden per extension
+    # with the 'matrix' key in constants.json
+    matrix = {
+        'c': [
+            {'name': 'gcc -O2', 'compiler': 'gcc -static -DONLINE_JUDGE -fno-asm -lm -s -O2 -o {binary} {source}', 'execute': './{binary}'},
+            {'name': 'gcc -O3', 'compiler': 'gcc -static -DONLINE_JUDGE -fno-asm -lm -s -O3 -o {binary} {source}', 'execute': './{binary}'},
+            {'name': 'clang -O2', 'compiler': 'clang -DONLINE_JUDGE -lm -O2 -o {binary} {source}', 'execute': './{binary}'},
+        ],
+        'cpp': [
+            {'name': 'g++ -O2', 'compiler': 'g++ -DONLINE_JUDGE -O2 -std=c++17 -o {binary} {source}', 'execute': './{binary}'},
+            {'name': 'g++ -O3', 'compiler': 'g++ -DONLINE_JUDGE -O3 -std=c++17 -o {binary} {source}', 'execute': './{binary}'},
+            {'name': 'clang++ -O2', 'compiler': 'clang++ -DONLINE_JUDGE -O2 -std=c++17 -o {binary} {source}', 'execute': './{binary}'},
+            {'name': 'clang++ -O3', 'compiler': 'clang++ -DONLINE_JUDGE -O3 -std=c++17 -o {binary} {source}', 'execute': './{binary}'},
+        ],
+        'py': [
+            {'name': 'CPython 3', 'compiler': None, 'execute': 'python3 {source}'},
+            {'name': 'CPython 2', 'compiler': None, 'execute': 'python2 {source}'},
+            {'name': 'PyPy 3', 'compiler': None, 'execute': 'pypy3 {source}'},
+        ],
+        'java': [
+            {'name': 'javac', 'compiler': 'mkdir -p {binary} && javac -d {binary} {source}',
+             'execute': 'java -DONLINE_JUDGE=true -cp {binary} {basename}'},
+        ],
     }
 
     @staticmethod
@@ -64,10 +130,31 @@ class Utilities:
                             action='store_true',
                             help='Add test to specific problem of contest')
 
+        parser.add_argument('--import-tests',
+                            dest='import_tests',
+                            metavar='PATH',
+                            help='Add all tests in a directory or archive (NN and NN.a, or *.in and *.out files) to a problem')
+
+        parser.add_argument('--link',
+                            dest='link',
+                            action='store_true',
+                            help='Hardlink the files of --import-tests instead of copying them. '
+                                 'They must not be edited afterwards, as the cache would change with them')
+
         parser.add_argument('--run',
                             dest='source_file',
                             help='Name of source file to be run')
 
+        parser.add_argument('--interactor',
+                            dest='interactor',
+                            metavar='SOURCE_FILE',
+                            help='Source of an interactor (testlib convention: interactor <input> <output> <answer>) to run an interactive problem with')
+
+        parser.add_argument('--matrix',
+                            dest='matrix',
+                            action='store_true',
+                            help='Build the source under every configured toolchain and compare running times')
+
         parser.add_argument('--set-default-site',
                             dest='default_site',
                             choices=supported_sites,
@@ -82,25 +169,106 @@ class Utilities:
                             action='store_true',
                             help='Clear cached test cases for a given site. Takes default site if -s flag is omitted')
 
-        parser.set_defaults(force=False, clear_cache=False)
+        parser.add_argument('--repeat',
+                            dest='repeat',
+                            type=int,
+                            help='Benchmark the solution by running every test case REPEAT times')
+
+        parser.add_argument('--warmup',
+                            dest='warmup',
+                            type=int,
+                            help='Number of discarded runs per test case before benchmarking (default 1)')
+
+        parser.add_argument('--pin',
+                            dest='pin',
+                            type=int,
+                            metavar='CPU',
+                            help='Pin benchmark runs to the given CPU core')
+
+        parser.add_argument('--limit-fraction',
+                            dest='limit_fraction',
+                            type=float,
+                            help='Flag tests whose median time exceeds this fraction of the time limit (default 0.5)')
+
+        parser.add_argument('--fail-fast',
+                            dest='fail_fast',
+                            action='store_true',
+                            help='Stop testing at the first test the solution fails')
+
+        parser.add_argument('--rerun',
+                            dest='rerun',
+                            action='store_true',
+                            help='Run all tests again instead of reusing results of the same binary on the same tests')
+
+        parser.add_argument('--history',
+                            dest='history',
+                            action='store_true',
+                            help='Show timing history of the solutions run against a given problem')
+
+        parser.add_argument('--time-scale',
+                            dest='time_scale',
+                            type=float,
+                            help='Multiply time limits by this factor, e.g. 1.5 for a slower local machine')
+
+        parser.add_argument('--search',
+                            dest='search',
+                            metavar='QUERY',
+                            help='Search the cached problem statements')
+
+        parser.add_argument('--export-cache',
+                            dest='export_cache',
+                            metavar='ARCHIVE',
+                            help='Export cached problems into a compressed archive. Only a given site/contest if -s/-c are specified')
+
+        parser.add_argument('--import-cache',
+                            dest='import_cache',
+                            metavar='ARCHIVE',
+                            help='Merge cached problems from an archive made by --export-cache')
+
+        parser.add_argument('--wait-and-fetch',
+                            dest='wait_and_fetch',
+                            action='store_true',
+                            help='Wait for a contest to start and download all problems as soon as they are visible')
+
+        parser.add_argument('--start-time',
+                            dest='start_time',
+                            help='Start time for --wait-and-fetch, as a unix timestamp, HH:MM[:SS] or YYYY-MM-DD HH:MM[:SS]')
+
+        parser.add_argument('--serve',
+                            dest='serve',
+                            action='store_true',
+                            help='Share the local cache with other machines over HTTP')
+
+        parser.add_argument('--port',
+                            dest='port',
+                            type=int,
+                            help='Port for --serve (default 8765)')
+
+        parser.add_argument('--completion',
+                            dest='completion',
+                            choices=['bash', 'zsh'],
+                            help='Print a shell completion script, e.g. eval "$(acedit --completion bash)"')
+
+        parser.set_defaults(force=False, clear_cache=False, matrix=False, fail_fast=False, rerun=False, history=False, time_scale=None,
+                            serve=False, port=8765, wait_and_fetch=False, start_time=None,
+                            repeat=None, warmup=1, pin=None, limit_fraction=0.5)
 
         args = parser.parse_args()
 
+        if args.completion:
+            # Like --help, this needs the parser itself
+            options = sorted(s for action in parser._actions for s in action.option_strings)
+            print(completion.get_script(args.completion, supported_sites, Utilities.languages, options))
+            sys.exit(0)
+
         flags = {}
 
         if args.site is None or args.contest is None:
-            import json
-            site, contest = None, None
-            try:
-                with open(os.path.join(Utilities.cache_dir, 'constants.json'), 'r') as f:
-                    data = f.read()
-                data = json.loads(data)
-                site = data.get(
-                    'default_site', None) if args.site is None else args.site
-                contest = data.get(
-                    'default_contest', None) if args.contest is None else args.contest
-            except:
-                pass
+            data = Utilities.get_constants()
+            site = data.get(
+                'default_site', None) if args.site is None else args.site
+            contest = data.get(
+                'default_contest', None) if args.contest is None else args.contest
 
             flags['site'] = site
             flags['contest'] = contest if not site == 'spoj' else None
@@ -115,21 +283,134 @@ class Utilities:
         flags['default_site'] = args.default_site
         flags['default_contest'] = args.default_contest
         flags['add_test'] = args.add_test
+        flags['import_tests'] = args.import_tests
+        flags['link'] = args.link
+        flags['matrix'] = args.matrix
+        flags['interactor'] = args.interactor
+        flags['repeat'] = args.repeat
+        flags['warmup'] = args.warmup
+        flags['pin'] = args.pin
+        flags['limit_fraction'] = args.limit_fraction
+        flags['history'] = args.history
+        flags['fail_fast'] = args.fail_fast
+        flags['rerun'] = args.rerun
+        flags['time_scale'] = args.time_scale
+        flags['search'] = args.search
+        flags['export_cache'] = args.export_cache
+        flags['import_cache'] = args.import_cache
+        flags['serve'] = args.serve
+        flags['wait_and_fetch'] = args.wait_and_fetch
+        flags['start_time'] = args.start_time
+        flags['port'] = args.port
+        # Site and contest as given on the command line, without defaults
+        flags['filter_site'] = args.site
+        flags['filter_contest'] = args.contest
 
         return flags
 
+    @staticmethod
+    def get_constants():
+        """
+        Utility method to read the settings stored in constants.json
+        """
+        return Utilities.read_json(os.path.join(Utilities.cache_dir, 'constants.json'), {})
+
+    @staticmethod
+    def read_json(path, default=None):
+        """
+        Utility method to load a json file, falling back
+        to a default value if it is missing or broken
+        """
+        try:
+            with open(path, 'r') as f:
+                return json.loads(f.read())
+        except (IOError, OSError, ValueError):
+            return default
+
+    @staticmethod
+    def write_json(path, data):
+        """
+        Utility method to dump data to a json file
+        """
+        Utilities.write_file(path, json.dumps(data, indent=2))
+
+    @staticmethod
+    def write_file(path, content):
+        """
+        Utility method to replace a file atomically. The content is
+        written to a temporary file next to it which is then renamed
+        over it, so other processes see either the old or the new file
+        """
+        import tempfile
+
+        handle, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp')
+        try:
+            with os.fdopen(handle, 'wb' if isinstance(content, bytes) else 'w') as f:
+                f.write(content)
+            os.chmod(temp_path, 0o666 & ~umask)
+            os.rename(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    @staticmethod
+    @contextmanager
+    def locked(path, shared=False):
+        """
+        Utility method to hold an exclusive lock for a file while it
+        is read, changed and written back, so changes made by acedit
+        processes running at the same time are not lost. A shared
+        lock only keeps out processes holding the exclusive one
+        """
+        import fcntl
+
+        with open(path + '.lock', 'a') as lock:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            yield
+
+    @staticmethod
+    def locked_objects(shared=True):
+        """
+        Utility method to lock the test storage. Processes storing
+        tests hold it shared until tests.json refers to them, garbage
+        collection holds it exclusively so it never removes them
+        """
+        return Utilities.locked(os.path.join(Utilities.cache_dir, 'tests'), shared)
+
+    @staticmethod
+    def makedirs(path):
+        """
+        Utility method to create a directory and its parents
+        unless they exist, possibly created by another process
+        """
+        try:
+            os.makedirs(path)
+        except OSError as e:
+            if e.errno != errno.EEXIST or not os.path.isdir(path):
+                raise
+
+    @staticmethod
+    def hash_file(path):
+        """
+        Utility method to get the sha1 digest of a file
+        """
+        import hashlib
+        digest = hashlib.sha1()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 16), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
     @staticmethod
     def set_constants(key, value):
         """
         Utility method to set default site and contest
         """
-        with open(os.path.join(Utilities.cache_dir, 'constants.json'), 'r+') as f:
-            data = f.read()
-            data = json.loads(data)
+        path = os.path.join(Utilities.cache_dir, 'constants.json')
+        with Utilities.locked(path):
+            data = Utilities.read_json(path, {})
             data[key] = value
-            f.seek(0)
-            f.write(json.dumps(data, indent=2))
-            f.truncate()
+            Utilities.write_json(path, data)
 
         print('Set %s to %s' % (key, value))
 
@@ -141,9 +422,7 @@ class Utilities:
         """
 
         if problem is None:
-            if not os.path.isdir(os.path.join(Utilities.cache_dir, site, contest)):
-                os.makedirs(os.path.join(Utilities.cache_dir, site,
-                                         contest))
+            Utilities.makedirs(os.path.join(Utilities.cache_dir, site, contest))
             return False
 
         # Handle case for SPOJ specially as it does not have contests
@@ -152,8 +431,8 @@ class Utilities:
         if os.path.isdir(os.path.join(Utilities.cache_dir, site, contest, problem)):
             return True
         else:
-            os.makedirs(os.path.join(Utilities.cache_dir, site,
-                                     contest, problem))
+            Utilities.makedirs(os.path.join(Utilities.cache_dir, site,
+                                            contest, problem))
             return False
 
     @staticmethod
@@ -171,9 +450,157 @@ class Utilities:
             except:
                 print('Some error occured. Try again.')
                 return
-            os.makedirs(os.path.join(Utilities.cache_dir, site))
+            Utilities.makedirs(os.path.join(Utilities.cache_dir, site))
+            Utilities.collect_garbage()
+            index = Utilities.get_search_index()
+            index.execute('BEGIN IMMEDIATE')
+            index.execute('DELETE FROM postings WHERE document IN (SELECT id FROM documents WHERE site = ?)', (site,))
+            index.execute('DELETE FROM documents WHERE site = ?', (site,))
+            index.execute('COMMIT')
+            index.close()
+            Utilities.build_completion_index()
             print('Done.')
 
+    @staticmethod
+    def collect_garbage():
+        """
+        Method to remove stored test files no problem refers to
+        """
+        tests_dir = os.path.join(Utilities.cache_dir, 'tests')
+        if not os.path.isdir(tests_dir):
+            return
+
+        with Utilities.locked_objects(shared=False):
+            referenced = set()
+            for root, dirs, files in os.walk(Utilities.cache_dir):
+                if 'tests.json' in files:
+                    for test in Utilities.read_json(os.path.join(root, 'tests.json'), []):
+                        referenced.update([test['input'], test['output']])
+
+            for prefix in os.listdir(tests_dir):
+                for digest in os.listdir(os.path.join(tests_dir, prefix)):
+                    # Files being written by other processes start with a dot
+                    if digest not in referenced and not digest.startswith('.'):
+                        os.remove(os.path.join(tests_dir, prefix, digest))
+
+    @staticmethod
+    def get_problem_dirs(site=None, contest=None):
+        """
+        Method to get (site, contest, problem) of all
+        cached problems, optionally of one site or contest
+        """
+        problems = []
+        sites = [site] if site else [d for d in os.listdir(Utilities.cache_dir)
+                                     if d not in ['tests', 'pch'] and os.path.isdir(os.path.join(Utilities.cache_dir, d))]
+
+        for site in sites:
+            site_path = os.path.join(Utilities.cache_dir, site)
+            if not os.path.isdir(site_path):
+                continue
+            if site == 'spoj':
+                problems += [(site, '', problem) for problem in sorted(os.listdir(site_path))]
+                continue
+            contests = [contest] if contest else sorted(os.listdir(site_path))
+            for contest_code in contests:
+                contest_path = os.path.join(site_path, contest_code)
+                if os.path.isdir(contest_path):
+                    problems += [(site, contest_code, problem) for problem in sorted(os.listdir(contest_path))
+                                 if os.path.isdir(os.path.join(contest_path, problem))]
+
+        return problems
+
+    @staticmethod
+    def export_cache(archive, site=None, contest=None):
+        """
+        Method to stream cached problems and their test
+        files into a single compressed archive
+        """
+        import tarfile
+
+        problems = Utilities.get_problem_dirs(site, contest)
+        digests = set()
+
+        with tarfile.open(archive, 'w|gz') as tar:
+            # Problem files first, test files they refer to afterwards
+            for site, contest, problem in problems:
+                problem_path = os.path.join(Utilities.cache_dir, site, contest, problem)
+                for input_path, output_path in Utilities.get_tests(problem_path):
+                    digests.update([os.path.basename(input_path), os.path.basename(output_path)])
+                for name in Utilities.exported_files:
+                    path = os.path.join(problem_path, name)
+                    if os.path.isfile(path):
+                        tar.add(path, arcname='/'.join(['problems', site, contest, problem, name]).replace('//', '/'))
+
+            for digest in sorted(digests):
+                tar.add(Utilities.get_object_path(digest), arcname='tests/%s/%s' % (digest[:2], digest))
+
+        print('Exported %d problems with %d test files to %s' % (len(problems), len(digests), archive))
+
+    @staticmethod
+    def import_cache(archive):
+        """
+        Method to merge cached problems from an archive made by
+        export_cache. Test files already present are skipped and
+        problem files are only rewritten if they changed
+        """
+        import tarfile
+
+        problems, objects = set(), 0
+
+        # Tests are stored before the tests.json referring to them
+        with Utilities.locked_objects():
+            with tarfile.open(archive, 'r|*') as tar:
+                for member in tar:
+                    parts = member.name.split('/')
+                    if not member.isfile() or '..' in parts or member.name.startswith('/'):
+                        continue
+
+                    if parts[0] == 'tests':
+                        path = Utilities.get_object_path(parts[-1])
+                        if os.path.isfile(path):
+                            continue
+                        objects += 1
+                    elif parts[0] == 'problems' and parts[-1] in Utilities.exported_files and len(parts) in [4, 5]:
+                        path = os.path.join(Utilities.cache_dir, *parts[1:])
+                        if parts[-1] != 'tests.json' and os.path.isfile(path) and \
+                                os.path.getsize(path) == member.size and os.path.getmtime(path) >= member.mtime:
+                            continue
+                        # Spoj problems have no contest
+                        site, contest, problem = parts[1:-1] if len(parts) == 5 else (parts[1], '', parts[2])
+                    else:
+                        continue
+
+                    Utilities.makedirs(os.path.dirname(path))
+                    source = tar.extractfile(member)
+
+                    if parts[0] == 'tests':
+                        Utilities.store_stream_object(source)
+                        continue
+
+                    if parts[-1] == 'tests.json':
+                        # Keep local tests, append the ones only the archive has
+                        with Utilities.locked(path):
+                            index = Utilities.read_json(path, [])
+                            count = len(index)
+                            for test in json.loads(source.read().decode('utf-8')):
+                                if test not in index:
+                                    index.append(test)
+                            if len(index) > count or count == 0:
+                                Utilities.write_json(path, index)
+                                problems.add((site, contest, problem))
+                        continue
+
+                    Utilities.write_file(path, source.read())
+                    os.utime(path, (member.mtime, member.mtime))
+                    problems.add((site, contest, problem))
+
+                    if parts[-1] == 'statement.txt':
+                        with open(path, 'rb') as f:
+                            Utilities.index_statement(site, contest, problem, f.read())
+
+        Utilities.build_completion_index()
+        print('Updated %d problems and added %d new test files' % (len(problems), objects))
+
     @staticmethod
     def get_long_input(message):
         print(message)
@@ -195,35 +622,450 @@ class Utilities:
         inputs = [Utilities.get_long_input('Specify input (^D or two consecutive empty lines to stop):')]
         outputs = [Utilities.get_long_input('Specify output (^D or two consecutive empty lines to stop):')]
         is_in_cache = Utilities.check_cache(args['site'], args['contest'], args['problem'])
-        Utilities.store_files(args['site'], args['contest'], args['problem'], inputs, outputs)
-        print('Test is successfully added')
+        if Utilities.store_files(args['site'], args['contest'], args['problem'], inputs, outputs) > 0:
+            print('Test is successfully added')
+        else:
+            print('Test already exists')
+
+    @staticmethod
+    def import_tests(args):
+        """
+        Method to add all tests found in a directory or an archive to
+        a problem. Files are hashed and copied in chunks, or hardlinked
+        with --link, so large tests are never loaded into memory
+        """
+        import tarfile
+        import zipfile
+
+        path = args['import_tests']
+        contest = '' if args['site'] == 'spoj' else args['contest']
+        testcases_path = os.path.join(Utilities.cache_dir, args['site'], contest, args['problem'])
+        print('Importing tests to %s (contest: %s, problem: %s)' % (args['site'], args['contest'], args['problem']))
+
+        # Moves tests cached by older versions to the test storage
+        Utilities.get_tests(testcases_path)
+        index_path = os.path.join(testcases_path, 'tests.json')
+
+        with Utilities.locked_objects():
+            # Relative file name -> (hash, whether the object is new)
+            stored = {}
+            if os.path.isdir(path):
+                names = []
+                for root, dirs, files in os.walk(path):
+                    names += [os.path.relpath(os.path.join(root, f), path) for f in files]
+                for name in set(n for pair in Utilities.pair_test_files(names) for n in pair):
+                    stored[name] = Utilities.store_file_object(os.path.join(path, name), args['link'])
+            elif zipfile.is_zipfile(path):
+                with zipfile.ZipFile(path) as archive:
+                    names = [info.filename for info in archive.infolist() if not info.filename.endswith('/')]
+                    for name in set(n for pair in Utilities.pair_test_files(names) for n in pair):
+                        source = archive.open(name)
+                        stored[name] = Utilities.store_stream_object(source)
+                        source.close()
+            elif os.path.isfile(path) and tarfile.is_tarfile(path):
+                with tarfile.open(path) as archive:
+                    members = dict((os.path.normpath(member.name), member)
+                                   for member in archive.getmembers() if member.isfile())
+                    paired = set(n for pair in Utilities.pair_test_files(list(members)) for n in pair)
+                    # In archive order, as seeking back in a compressed
+                    # archive decompresses it from the start again
+                    for name in sorted(paired, key=lambda name: members[name].offset_data):
+                        stored[name] = Utilities.store_stream_object(archive.extractfile(members[name]))
+            else:
+                print('ERROR : %s is not a directory or an archive' % (path))
+                sys.exit(0)
+
+            pairs = Utilities.pair_test_files(list(stored))
+
+            Utilities.check_cache(args['site'], args['contest'], args['problem'])
+            added = 0
+
+            with Utilities.locked(index_path):
+                index = Utilities.read_json(index_path, [])
+                known = set((test['input'], test['output']) for test in index)
+                for input_name, output_name in pairs:
+                    test = (stored[input_name][0], stored[output_name][0])
+                    if test not in known:
+                        known.add(test)
+                        index.append({'input': test[0], 'output': test[1]})
+                        added += 1
+                Utilities.write_json(index_path, index)
+
+        Utilities.add_to_completion_index(args['site'], contest, args['problem'])
+        print('Found %d tests, %d of them new. The problem has %d tests now.' % (len(pairs), added, len(index)))
+
+    @staticmethod
+    def pair_test_files(names):
+        """
+        Method to find pairs of input and output files among file
+        names, either NN and NN.a or NN.in and NN.out (or .ans).
+        Returns them in natural order of the input names
+        """
+        names = set(names)
+        pairs = []
+        for name in names:
+            if name + '.a' in names:
+                pairs.append((name, name + '.a'))
+            elif name.endswith('.in'):
+                for extension in ['.out', '.ans']:
+                    if name[:-3] + extension in names:
+                        pairs.append((name, name[:-3] + extension))
+                        break
+
+        def natural(pair):
+            return [int(part) if part.isdigit() else part for part in re.split(r'(\d+)', pair[0])]
+
+        return sorted(pairs, key=natural)
+
+    @staticmethod
+    def store_file_object(path, link=False):
+        """
+        Method to store a test file in the content addressed storage
+        by copying it, or by hardlinking it if asked to and it is on
+        the same file system. Returns its hash and whether it was not
+        stored before
+        """
+        if not link:
+            with open(path, 'rb') as source:
+                return Utilities.store_stream_object(source)
+
+        digest = Utilities.hash_file(path)
+        object_path = Utilities.get_object_path(digest)
+        if os.path.isfile(object_path):
+            return digest, False
+
+        Utilities.makedirs(os.path.dirname(object_path))
+        try:
+            os.link(path, object_path)
+        except OSError:
+            with open(path, 'rb') as source:
+                Utilities.store_stream_object(source)
+        return digest, True
 
     @staticmethod
-    def getTestCasesCount(p):
-        return len([f for f in os.listdir(p) if f.endswith('.a')])
+    def store_stream_object(source):
+        """
+        Method to store a test file read from a file object in the
+        content addressed storage, chunk by chunk. Returns its hash
+        and whether it was not stored before
+        """
+        import hashlib
+        import tempfile
+
+        digest = hashlib.sha1()
+        handle, temp_path = tempfile.mkstemp(dir=Utilities.cache_dir, prefix='.import')
+        with os.fdopen(handle, 'wb') as target:
+            for chunk in iter(lambda: source.read(1 << 16), b''):
+                digest.update(chunk)
+                target.write(chunk)
+
+        digest = digest.hexdigest()
+        object_path = Utilities.get_object_path(digest)
+        if os.path.isfile(object_path):
+            os.remove(temp_path)
+            return digest, False
+
+        Utilities.makedirs(os.path.dirname(object_path))
+        os.chmod(temp_path, 0o666 & ~umask)
+        os.rename(temp_path, object_path)
+        return digest, True
+
+    @staticmethod
+    def get_object_path(digest):
+        """
+        Method to get the path a test file with the
+        given content hash is stored at
+        """
+        return os.path.join(Utilities.cache_dir, 'tests', digest[:2], digest)
 
     @staticmethod
-    def store_files(site, contest, problem, inputs, outputs, statement=None):
+    def store_object(content):
         """
-        Method to store the test cases in files
+        Method to store the content of a test file once in the
+        content addressed storage and return its hash
+        """
+        import hashlib
+
+        if not isinstance(content, bytes):
+            content = content.encode('utf-8')
+        digest = hashlib.sha1(content).hexdigest()
+        path = Utilities.get_object_path(digest)
+
+        if not os.path.isfile(path):
+            Utilities.makedirs(os.path.dirname(path))
+            Utilities.write_file(path, content)
+
+        return digest
+
+    @staticmethod
+    def get_tests(testcases_path):
+        """
+        Method to get (input, output) paths of the distinct test cases
+        of a problem in order. Problems cached as numbered files
+        by older versions are moved to the test storage first
+        """
+        index_path = os.path.join(testcases_path, 'tests.json')
+        index = Utilities.read_json(index_path)
+
+        if index is None and os.path.isdir(testcases_path):
+            with Utilities.locked_objects(), Utilities.locked(index_path):
+                # Another process may have moved them meanwhile
+                index = Utilities.read_json(index_path)
+                if index is None:
+                    index = Utilities.move_numbered_tests(testcases_path)
+
+        return [(Utilities.get_object_path(test['input']), Utilities.get_object_path(test['output']))
+                for test in index or []]
+
+    @staticmethod
+    def move_numbered_tests(testcases_path):
+        """
+        Method to move the test cases of a problem cached as numbered
+        files by older versions to the test storage. Returns the index
+        """
+        index = []
+        numbered = sorted([int(f[:-2]) for f in os.listdir(testcases_path)
+                           if f.endswith('.a') and f[:-2].isdigit()])
+        for i in numbered:
+            with open(os.path.join(testcases_path, str(i)), 'rb') as in_handler, \
+                    open(os.path.join(testcases_path, str(i) + '.a'), 'rb') as out_handler:
+                test = {'input': Utilities.store_object(in_handler.read()),
+                        'output': Utilities.store_object(out_handler.read())}
+            if test not in index:
+                index.append(test)
+        if len(numbered) > 0:
+            Utilities.write_json(os.path.join(testcases_path, 'tests.json'), index)
+            for i in numbered:
+                os.remove(os.path.join(testcases_path, str(i)))
+                os.remove(os.path.join(testcases_path, str(i) + '.a'))
+        return index
+
+    @staticmethod
+    def store_files(site, contest, problem, inputs, outputs, statement=None, limits=None):
+        """
+        Method to store the test cases in files.
+        Returns the number of tests that were not stored before
         """
 
         # Handle case for SPOJ specially as it does not have contests
         contest = '' if site == 'spoj' else contest
         testcases_path = os.path.join(Utilities.cache_dir, site, contest, problem)
-        num_cases = Utilities.getTestCasesCount(testcases_path)
-        def writeFile(filename, content):
-            with open(filename, 'w') as handler:
-                handler.write(content)
 
-        for i, inp in enumerate(inputs):
-            writeFile(os.path.join(testcases_path, str(i + num_cases)), inp)
+        # Moves tests cached by older versions to the test storage
+        Utilities.get_tests(testcases_path)
+        index_path = os.path.join(testcases_path, 'tests.json')
 
-        for i, out in enumerate(outputs):
-            writeFile(os.path.join(testcases_path, str(i + num_cases) + '.a'), out)
+        with Utilities.locked_objects():
+            tests = [{'input': Utilities.store_object(inp), 'output': Utilities.store_object(out)}
+                     for inp, out in zip(inputs, outputs)]
+
+            with Utilities.locked(index_path):
+                index = Utilities.read_json(index_path, [])
+                num_cases = len(index)
+                for test in tests:
+                    if test not in index:
+                        index.append(test)
+
+                if len(index) > num_cases or not os.path.isfile(index_path):
+                    Utilities.write_json(index_path, index)
 
         if statement:
-            writeFile(os.path.join(testcases_path, 'statement.txt'), statement)
+            Utilities.write_file(os.path.join(testcases_path, 'statement.txt'), statement)
+            Utilities.index_statement(site, contest, problem, statement)
+
+        if limits:
+            Utilities.write_json(os.path.join(testcases_path, 'limits.json'), limits)
+
+        Utilities.add_to_completion_index(site, contest, problem)
+
+        return len(index) - num_cases
+
+    @staticmethod
+    def build_completion_index():
+        """
+        Method to write the index of cached problems read by
+        shell completion
+        """
+        path = os.path.join(Utilities.cache_dir, completion.index_name)
+        with Utilities.locked(path):
+            Utilities.write_completion_index(path, [])
+
+    @staticmethod
+    def write_completion_index(path, lines):
+        """
+        Method to write the index read by shell completion from the
+        cached problems and the given lines
+        """
+        lines = set(lines + ['%s %s %s' % (site, contest or '-', problem)
+                             for site, contest, problem in Utilities.get_problem_dirs()])
+        Utilities.write_file(path, ''.join(line + '\n' for line in sorted(lines)))
+
+    @staticmethod
+    def add_to_completion_index(site, contest, problem):
+        """
+        Method to add a problem to the index read by shell completion,
+        building it from the cache if it does not exist
+        """
+        path = os.path.join(Utilities.cache_dir, completion.index_name)
+        line = '%s %s %s' % (site, contest or '-', problem)
+
+        with Utilities.locked(path):
+            if not os.path.isfile(path):
+                Utilities.write_completion_index(path, [line])
+                return
+
+            with open(path) as f:
+                lines = f.read().splitlines()
+            if line not in lines:
+                Utilities.write_file(path, ''.join(l + '\n' for l in sorted(lines + [line])))
+
+    @staticmethod
+    def get_search_index():
+        """
+        Method to open the inverted index over cached problem
+        statements, building it from the cache if it does not exist
+        """
+        import sqlite3
+
+        path = os.path.join(Utilities.cache_dir, 'search.db')
+        # Transactions are started explicitly, so that writers can
+        # take the database lock up front with BEGIN IMMEDIATE
+        index = sqlite3.connect(path, timeout=60, isolation_level=None)
+
+        # Several downloads may open the index for the first time at
+        # once, only one of them creates and fills it
+        with Utilities.locked(path):
+            exists = index.execute("SELECT 1 FROM sqlite_master WHERE name = 'documents'").fetchone()
+            if not exists:
+                index.executescript("""
+                    CREATE TABLE IF NOT EXISTS documents (
+                        id INTEGER PRIMARY KEY,
+                        site TEXT, contest TEXT, problem TEXT, length INTEGER,
+                        UNIQUE (site, contest, problem));
+                    CREATE TABLE IF NOT EXISTS postings (
+                        term TEXT, document INTEGER, frequency INTEGER,
+                        PRIMARY KEY (term, document));
+                    CREATE INDEX IF NOT EXISTS postings_document ON postings (document);
+                """)
+                index.execute('BEGIN IMMEDIATE')
+                for root, dirs, files in os.walk(Utilities.cache_dir):
+                    if 'statement.txt' in files:
+                        parts = os.path.relpath(root, Utilities.cache_dir).split(os.sep)
+                        site, contest, problem = parts[0], os.sep.join(parts[1:-1]), parts[-1]
+                        with open(os.path.join(root, 'statement.txt'), 'rb') as f:
+                            Utilities.index_statement(site, contest, problem, f.read(), index)
+                index.execute('COMMIT')
+
+        return index
+
+    @staticmethod
+    def tokenize(text):
+        """
+        Utility method to split text into lowercase search terms
+        """
+        if isinstance(text, bytes):
+            text = text.decode('utf-8', 'replace')
+        return re.findall(r'\w+', text.lower(), re.UNICODE)
+
+    @staticmethod
+    def index_statement(site, contest, problem, statement, index=None):
+        """
+        Method to add or replace a problem statement in the search index
+        """
+        from collections import Counter
+
+        if index is None:
+            index = Utilities.get_search_index()
+            index.execute('BEGIN IMMEDIATE')
+            Utilities.index_statement(site, contest, problem, statement, index)
+            index.execute('COMMIT')
+            index.close()
+            return
+
+        terms = Utilities.tokenize(statement)
+        index.execute('INSERT OR IGNORE INTO documents (site, contest, problem) VALUES (?, ?, ?)',
+                      (site, contest, problem))
+        document = index.execute('SELECT id FROM documents WHERE site = ? AND contest = ? AND problem = ?',
+                                 (site, contest, problem)).fetchone()[0]
+        index.execute('UPDATE documents SET length = ? WHERE id = ?', (len(terms), document))
+        index.execute('DELETE FROM postings WHERE document = ?', (document,))
+
+        index.executemany('INSERT INTO postings (term, document, frequency) VALUES (?, ?, ?)',
+                          [(term, document, count) for term, count in Counter(terms).items()])
+
+    @staticmethod
+    def search(query, limit=10):
+        """
+        Method to find the cached problems whose statements match
+        a query best, ranked with BM25
+        """
+        import math
+        from terminaltables import AsciiTable
+
+        terms = list(set(Utilities.tokenize(query)))
+        if len(terms) == 0:
+            print('Empty query.')
+            return
+
+        index = Utilities.get_search_index()
+        total, average = index.execute('SELECT COUNT(*), AVG(length) FROM documents').fetchone()
+
+        k1, b = 1.2, 0.75
+        scores = {}
+        for term in terms:
+            postings = index.execute(
+                'SELECT document, frequency, length FROM postings JOIN documents ON document = id WHERE term = ?',
+                (term,)).fetchall()
+            idf = math.log(1 + (total - len(postings) + 0.5) / (len(postings) + 0.5))
+            for document, frequency, length in postings:
+                scores[document] = scores.get(document, 0) + idf * frequency * (k1 + 1) / (
+                    frequency + k1 * (1 - b + b * length / average))
+
+        if len(scores) == 0:
+            print('No matching problems found.')
+            return
+
+        table_data = [['Site', 'Contest', 'Problem', 'Score', 'Match']]
+        for document in sorted(scores, key=lambda document: -scores[document])[:limit]:
+            site, contest, problem = index.execute(
+                'SELECT site, contest, problem FROM documents WHERE id = ?', (document,)).fetchone()
+
+            match = ''
+            statement = os.path.join(Utilities.cache_dir, site, contest, problem, 'statement.txt')
+            lines = open(statement, 'rb').read().decode('utf-8', 'replace').split('\n') if os.path.isfile(statement) else []
+            for line in lines:
+                if set(Utilities.tokenize(line)) & set(terms):
+                    match = line.strip()
+                    match = match if len(match) <= 60 else match[:57] + '...'
+                    break
+
+            table_data.append([site, contest, problem, '%.2f' % (scores[document]), match])
+
+        index.close()
+        print(AsciiTable(table_data).table)
+
+    @staticmethod
+    def parse_limits(time_text, memory_text):
+        """
+        Method to get time (seconds) and memory (MB) limits
+        from the texts shown on a problem page
+        """
+        limits = {}
+        if isinstance(memory_text, bytes):
+            memory_text = memory_text.decode('utf-8', 'ignore')
+        time_match = re.search(r'(\d+(?:\.\d+)?)', time_text or '')
+        memory_match = re.search(r'(\d+(?:\.\d+)?)', memory_text or '')
+        if time_match:
+            limits['time'] = float(time_match.group(1))
+        if memory_match:
+            memory = float(memory_match.group(1))
+            # Russian statements spell out the units
+            if re.search(u'(gb|gigabyte|\u0433\u0438\u0433\u0430\u0431\u0430\u0439\u0442)', memory_text, re.I | re.U):
+                memory *= 1024
+            elif re.search(u'(kb|kilobyte|\u043a\u0438\u043b\u043e\u0431\u0430\u0439\u0442)', memory_text, re.I | re.U):
+                memory /= 1024
+            limits['memory'] = memory
+        return limits
 
     @staticmethod
     def get_platform(args):
@@ -249,6 +1091,9 @@ class Utilities:
             print('Test cases found in cache...')
             sys.exit(0)
 
+        if Utilities.fetch_from_cache_server('problem', platform.site, platform.contest, platform.problem):
+            return
+
         platform.scrape_problem()
 
     @staticmethod
@@ -260,17 +1105,187 @@ class Utilities:
         Utilities.check_cache(
             platform.site, platform.contest, platform.problem)
 
+        if Utilities.fetch_from_cache_server('contest', platform.site, platform.contest):
+            return
+
         platform.scrape_contest()
+        Utilities.store_contest_problems(platform.site, platform.contest)
 
     @staticmethod
-    def input_file_to_string(path, num_cases):
+    def store_contest_problems(site, contest, problems=None):
+        """
+        Method to record the problems of a contest after all of them
+        were downloaded, so a partly cached contest can be told apart
+        from a complete one
+        """
+        if problems is None:
+            problems = [problem for _, _, problem in Utilities.get_problem_dirs(site, contest)
+                        if Utilities.get_tests(os.path.join(Utilities.cache_dir, site, contest, problem))]
+        Utilities.write_json(os.path.join(Utilities.cache_dir, site, contest, 'problems.json'), sorted(problems))
+
+    @staticmethod
+    def read_contest(site, contest):
+        """
+        Method to get everything cached for all problems of a contest
+        as a list of dicts, or None unless the whole contest is cached
+        """
+        problems = Utilities.read_json(os.path.join(Utilities.cache_dir, site, contest, 'problems.json'))
+        if not problems:
+            return None
+
+        data = [Utilities.read_problem(site, contest, problem) for problem in problems]
+        return data if all(data) else None
+
+    @staticmethod
+    def read_problem(site, contest, problem):
+        """
+        Method to get everything cached for a problem as a dict,
+        or None if it has no test cases cached
+        """
+        contest = '' if site == 'spoj' else contest
+        problem_path = os.path.join(Utilities.cache_dir, site, contest, problem)
+        tests = Utilities.get_tests(problem_path)
+
+        if len(tests) == 0:
+            return None
+
+        def read(path):
+            with open(path, 'rb') as handler:
+                return handler.read().decode('utf-8')
+
+        statement_path = os.path.join(problem_path, 'statement.txt')
+        return {
+            'problem': problem,
+            'inputs': [read(input_path) for input_path, _ in tests],
+            'outputs': [read(output_path) for _, output_path in tests],
+            'statement': read(statement_path) if os.path.isfile(statement_path) else None,
+            'limits': Utilities.read_json(os.path.join(problem_path, 'limits.json')),
+        }
+
+    @staticmethod
+    def fetch_from_cache_server(kind, site, contest, problem=None):
+        """
+        Method to download a problem or a contest from the shared cache
+        server set as 'cache_server' in constants.json. Returns False if
+        no server is set or it could not provide the test cases
+        """
+        server = Utilities.get_constants().get('cache_server')
+        if not server:
+            return False
+
+        print('Asking cache server ' + server + '...')
+        try:
+            r = rq.get(server.rstrip('/') + '/' + kind, timeout=120,
+                       params={'site': site, 'contest': contest or '', 'problem': problem or ''})
+            problems = r.json()['problems'] if r.status_code == 200 else []
+        except Exception:
+            problems = []
+
+        if len(problems) == 0:
+            print('Not available on cache server...')
+            return False
+
+        for data in problems:
+            Utilities.check_cache(site, contest, data['problem'])
+            Utilities.store_files(site, contest, data['problem'], data['inputs'],
+                                  data['outputs'], data['statement'], data['limits'])
+        if kind == 'contest':
+            Utilities.store_contest_problems(site, contest, [data['problem'] for data in problems])
+
+        print('Done. Fetched %d problems from cache server.' % (len(problems)))
+        return True
+
+    @staticmethod
+    def serve(port, supported_sites):
+        """
+        Method to share the local cache over HTTP. Problems
+        and contests missing from it are downloaded on request,
+        once for all clients asking for them at the same time
+        """
+        from gevent.event import Event
+        from gevent.pywsgi import WSGIServer
+        try:
+            from urlparse import parse_qs
+        except ImportError:
+            from urllib.parse import parse_qs
+
+        # Requests are handled in greenlets of a single thread
+        in_flight = {}
+
+        def read_through(key, read, download):
+            data = read()
+            if data:
+                return data
+
+            if key in in_flight:
+                in_flight[key].wait()
+                return read()
+
+            in_flight[key] = Event()
+            try:
+                download()
+            except (Exception, SystemExit):
+                pass
+            finally:
+                in_flight.pop(key).set()
+
+            return read()
+
+        def application(environ, start_response):
+            query = dict((key, values[0]) for key, values in parse_qs(environ.get('QUERY_STRING', '')).items())
+            site, contest, problem = query.get('site'), query.get('contest', ''), query.get('problem', '')
+            args = {'site': site, 'contest': contest or None, 'problem': problem or None, 'force': True}
+            path = environ.get('PATH_INFO', '')
+
+            def reply(status, problems):
+                body = json.dumps({'problems': problems}).encode('utf-8')
+                start_response(status, [('Content-Type', 'application/json'),
+                                        ('Content-Length', str(len(body)))])
+                return [body]
+
+            # Codes become paths in the cache, so nothing else is accepted
+            if site not in supported_sites or (not contest and site != 'spoj') or \
+                    not all(re.match(r'^[A-Za-z0-9_-]*$', code) for code in [contest, problem]):
+                return reply('400 Bad Request', [])
+
+            if path == '/problem' and problem:
+                def read():
+                    data = Utilities.read_problem(site, contest, problem)
+                    return [data] if data else []
+
+                def download():
+                    platform = Utilities.get_platform(args)
+                    Utilities.check_cache(platform.site, platform.contest, platform.problem)
+                    platform.scrape_problem()
+
+            elif path == '/contest' and site != 'spoj':
+                def read():
+                    return Utilities.read_contest(site, contest) or []
+
+                def download():
+                    platform = Utilities.get_platform(args)
+                    Utilities.check_cache(platform.site, platform.contest, None)
+                    platform.scrape_contest()
+                    Utilities.store_contest_problems(platform.site, platform.contest)
+
+            else:
+                return reply('404 Not Found', [])
+
+            problems = read_through((path, site, contest, problem), read, download)
+            return reply('200 OK' if problems else '404 Not Found', problems)
+
+        print('Serving cache %s on port %d...' % (Utilities.cache_dir, port))
+        WSGIServer(('', port), application).serve_forever()
+
+    @staticmethod
+    def input_file_to_string(tests):
         """
         Method to return sample inputs as a list
         """
         inputs = []
 
-        for i in xrange(num_cases):
-            with open(os.path.join(path, str(i)), 'r') as fh:
+        for input_path, _ in tests:
+            with open(input_path, 'r') as fh:
                 inputs += [fh.read()]
 
         return inputs
@@ -310,20 +1325,143 @@ class Utilities:
         print('Done. Exiting gracefully.')
 
     @staticmethod
-    def run_command_on_one_test(testcases_path, testcase_number, execute_command):
-        status = os.system('timeout 2s ' + execute_command + ' < ' + os.path.join(
-            testcases_path, str(testcase_number)) + ' > temp_output' + str(testcase_number))
+    def get_limits(testcases_path, extension, args):
+        """
+        Method to get the limits a solution is run with, taken from
+        the cached problem metadata and scaled for the local machine
+        """
+        limits = Utilities.read_json(os.path.join(testcases_path, 'limits.json'), {})
+        scale = args.get('time_scale') or Utilities.get_constants().get('time_scale', 1.0)
+
+        return {
+            'time': limits.get('time', Utilities.time_limit) * scale,
+            'memory': limits.get('memory', Utilities.memory_limit),
+            # The JVM reserves far more address space than it uses
+            'address_space': extension not in ['java', 'kt'],
+        }
+
+    @staticmethod
+    def spawn(command, stdin=None, stdout=None, stderr=None, limits=None, prepare=None):
+        """
+        Method to start a shell command in a new process group with
+        the given file descriptors, CPU time and address space rlimits.
+        prepare is called with the command in the new process and
+        returns the command to run instead, so slow preparations
+        happen in the background too. Returns the pid, to be reaped
+        with os.wait4
+        """
+        pid = fork()
+        if pid == 0:
+            try:
+                for fd, target in [(stdin, 0), (stdout, 1), (stderr, 2)]:
+                    if fd is not None:
+                        os.dup2(fd, target)
+                os.setsid()
+                # Python ignores these, which would be inherited through exec
+                signal.signal(signal.SIGPIPE, signal.SIG_DFL)
+                signal.signal(signal.SIGXFSZ, signal.SIG_DFL)
+                if prepare is not None:
+                    command = prepare(command)
+                if limits is not None:
+                    cpu = int(limits['time']) + 1
+                    resource.setrlimit(resource.RLIMIT_CPU, (cpu, cpu + 1))
+                    if limits['memory'] and limits['address_space']:
+                        memory = int(limits['memory'] * 1024 * 1024)
+                        resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+                os.execv('/bin/sh', ['/bin/sh', '-c', command])
+            finally:
+                os._exit(127)
+        return pid
+
+    @staticmethod
+    def get_status(status):
+        """
+        Utility method to turn a wait status into an exit code,
+        negative signal number for processes killed by a signal
+        """
+        return os.WEXITSTATUS(status) if os.WIFEXITED(status) else -os.WTERMSIG(status)
+
+    @staticmethod
+    def execute(command, input_path, output_path, limits=None):
+        """
+        Method to run a command on a given input file and collect
+        its exit status, wall time, cpu time and peak memory (KB).
+        CPU time and address space are capped with rlimits, wall
+        time with a timer killing the whole process group
+        """
+        import tempfile
+        import threading
+
+        timed_out = []
+
+        def kill(pid):
+            timed_out.append(True)
+            try:
+                os.killpg(pid, signal.SIGKILL)
+            except OSError:
+                pass
+
+        err_handler = tempfile.TemporaryFile()
+        with open(input_path, 'r') as in_handler, open(output_path, 'w') as out_handler:
+            start = time.time()
+            pid = Utilities.spawn(command, in_handler.fileno(), out_handler.fileno(),
+                                  err_handler.fileno(), limits)
+            timer = None
+            if limits is not None:
+                timer = threading.Timer(max(2 * limits['time'], limits['time'] + 1), kill, [pid])
+                timer.start()
+            _, status, usage = os.wait4(pid, 0)
+            wall = time.time() - start
+            if timer is not None:
+                timer.cancel()
+
+        # Pass stderr through, looking for failed allocations on the way
+        err_handler.seek(0)
+        errors = err_handler.read().decode('utf-8', 'replace')
+        err_handler.close()
+        sys.stderr.write(errors)
+
+        return {
+            'status': Utilities.get_status(status),
+            'wall': wall,
+            'cpu': usage.ru_utime + usage.ru_stime,
+            'memory': usage.ru_maxrss,
+            'timed_out': len(timed_out) > 0,
+            'out_of_memory': re.search(Utilities.out_of_memory_pattern, errors) is not None,
+        }
+
+    @staticmethod
+    def get_verdict(stats, limits):
+        """
+        Method to get the verdict of a finished run
+        except for checking its output
+        """
+        if limits is not None:
+            if stats['timed_out'] or stats['cpu'] > limits['time'] or \
+                    stats['status'] in [-signal.SIGXCPU, 128 + signal.SIGXCPU]:
+                return 'TLE'
+            if limits['memory'] and stats['memory'] > limits['memory'] * 1024:
+                return 'MLE'
+            # A failed allocation under the address space limit shows up as a crash
+            if stats['status'] != 0 and limits['memory'] and stats['out_of_memory']:
+                return 'MLE'
+        if stats['status'] != 0:
+            return 'RTE'
+        return 'AC'
+
+    @staticmethod
+    def run_command_on_one_test(tests, testcase_number, execute_command, limits=None, output_prefix='temp_output'):
+        input_path, output_path = tests[testcase_number]
+        output_file = output_prefix + str(testcase_number)
+        stats = Utilities.execute(execute_command, input_path, output_file, limits)
+        verdict = Utilities.get_verdict(stats, limits)
         user_output = ''
-        with open(os.path.join(testcases_path, str(testcase_number) + '.a'), 'r') as out_handler:
+        with open(output_path, 'r') as out_handler:
             expected_output = out_handler.read().strip().split('\n')
             expected_output = '\n'.join([line.strip() for line in expected_output])
-            if status == 124:
-                # Time Limit Exceeded
-                results = Utilities.verdicts['TLE']
-
-            elif status == 0:
+            if verdict == 'AC':
                 # Ran successfully
-                with open('temp_output' + str(testcase_number), 'r') as temp_handler:
+                with open(output_file, 'r') as temp_handler:
                     user_output = temp_handler.read().strip().split('\n')
                     user_output = '\n'.join([line.strip() for line in user_output])
 
@@ -335,14 +1473,673 @@ class Utilities:
                     results = Utilities.verdicts['WA']
 
             else:
-                # Runtime Error
-                results = Utilities.verdicts['RTE']
-        return (expected_output, user_output, results)
+                # Time Limit Exceeded, Memory Limit Exceeded or Runtime Error
+                results = Utilities.verdicts[verdict]
+        return (expected_output, user_output, results, stats)
+
+    @staticmethod
+    def hash_artifact(problem_path, extension, basename):
+        """
+        Method to get the sha1 digest of what is executed for a
+        solution: the binary, class files or the script itself
+        """
+        import glob
+        import hashlib
+
+        if extension in ['py', 'rb']:
+            paths = [problem_path + '.' + extension]
+        elif extension in ['java', 'kt']:
+            # The source too, as other classes it declares are not
+            # named after it and may sit among unrelated class files
+            paths = [problem_path + '.' + extension] + sorted(glob.glob(basename + '*.class'))
+        else:
+            paths = [basename]
+
+        digest = hashlib.sha1()
+        for path in paths:
+            digest.update(Utilities.hash_file(path).encode('utf-8'))
+        return digest.hexdigest()
+
+    @staticmethod
+    def get_result_path(artifact, execute_command, test, limits):
+        """
+        Method to get the path the result of running a solution
+        on a test case under given limits is stored at
+        """
+        import hashlib
+
+        # Test files are named by the hash of their content
+        key = json.dumps([artifact, execute_command, [os.path.basename(path) for path in test], limits],
+                         sort_keys=True)
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        return os.path.join(Utilities.cache_dir, 'results', digest[:2], digest + '.json')
+
+    @staticmethod
+    def run_memoized(tests, testcase_number, execute_command, limits, artifact):
+        """
+        Method to run a solution on one test case, reusing the result
+        of an earlier run of the same artifact on the same test.
+        Returns the result and whether it was reused
+        """
+        if artifact is None:
+            return Utilities.run_command_on_one_test(tests, testcase_number, execute_command, limits), False
+
+        result_path = Utilities.get_result_path(artifact, execute_command, tests[testcase_number], limits)
+        result = Utilities.read_json(result_path)
+        if result is not None:
+            return tuple(result), True
+
+        result = Utilities.run_command_on_one_test(tests, testcase_number, execute_command, limits)
+        Utilities.makedirs(os.path.dirname(result_path))
+        Utilities.write_json(result_path, result)
+        return result, False
+
+    @staticmethod
+    def pipe():
+        """
+        Utility method to create a pipe whose ends are
+        not inherited by processes started meanwhile
+        """
+        import fcntl
+
+        fds = os.pipe()
+        for fd in fds:
+            fcntl.fcntl(fd, fcntl.F_SETFD, fcntl.fcntl(fd, fcntl.F_GETFD) | fcntl.FD_CLOEXEC)
+        return fds
+
+    @staticmethod
+    def run_command_on_one_interactive_test(tests, testcase_number, execute_command, interactor_command, limits):
+        """
+        Method to run a solution against an interactor on one test case,
+        relaying and recording everything they send each other
+        """
+        import threading
+        try:
+            from shlex import quote
+        except ImportError:
+            from pipes import quote
+
+        input_path, output_path = tests[testcase_number]
+        result_file = 'temp_output' + str(testcase_number)
+        interactor_limits = dict(limits, memory=None, time=limits['time'] * Utilities.interactor_time_factor)
+        transcript = []
+
+        def relay(source, target, direction):
+            while True:
+                try:
+                    data = os.read(source, 1 << 16)
+                except OSError:
+                    data = b''
+                if not data:
+                    break
+                transcript.append((direction, data))
+                # Keep draining the source if the other side went away
+                while target is not None and data:
+                    try:
+                        data = data[os.write(target, data):]
+                    except OSError:
+                        os.close(target)
+                        target = None
+            os.close(source)
+            if target is not None:
+                os.close(target)
+
+        solution_in, to_solution = Utilities.pipe()
+        from_solution, solution_out = Utilities.pipe()
+        interactor_in, to_interactor = Utilities.pipe()
+        from_interactor, interactor_out = Utilities.pipe()
+
+        relays = [threading.Thread(target=relay, args=(from_solution, to_interactor, '> ')),
+                  threading.Thread(target=relay, args=(from_interactor, to_solution, '< '))]
+        for thread in relays:
+            thread.start()
+
+        outcome = {}
+
+        def run(name, command, stdin, stdout, side_limits):
+            start = time.time()
+            pid = Utilities.spawn(command, stdin, stdout, limits=side_limits)
+            os.close(stdin)
+            os.close(stdout)
+            timed_out = []
+
+            def kill():
+                timed_out.append(True)
+                try:
+                    os.killpg(pid, signal.SIGKILL)
+                except OSError:
+                    pass
+
+            timer = threading.Timer(max(2 * side_limits['time'], side_limits['time'] + 1), kill)
+            timer.start()
+            _, status, usage = os.wait4(pid, 0)
+            timer.cancel()
+            outcome[name] = {
+                'status': Utilities.get_status(status),
+                'wall': time.time() - start,
+                'cpu': usage.ru_utime + usage.ru_stime,
+                'memory': usage.ru_maxrss,
+                'timed_out': len(timed_out) > 0,
+                'out_of_memory': False,
+            }
+
+        interactor = threading.Thread(target=run, args=(
+            'interactor', ' '.join([interactor_command, quote(input_path), quote(result_file), quote(output_path)]),
+            interactor_in, interactor_out, interactor_limits))
+        interactor.start()
+        run('solution', execute_command, solution_in, solution_out, limits)
+        interactor.join()
+        for thread in relays:
+            thread.join()
+
+        verdict = Utilities.get_verdict(outcome['solution'], limits)
+        if verdict == 'AC':
+            status = outcome['interactor']['status']
+            if outcome['interactor']['timed_out']:
+                # The interactor waited for a solution that stopped talking
+                verdict = 'TLE'
+            elif status != 0:
+                # testlib exit codes: 1 wrong answer, 2 presentation error, 3 fail
+                verdict = 'WA' if status in [1, 2] else 'FAIL'
+
+        # Chunks are split wherever the pipes were read, merge them back into messages
+        messages = []
+        for direction, data in transcript:
+            if messages and messages[-1][0] == direction:
+                messages[-1][1] += data
+            else:
+                messages.append([direction, data])
+
+        lines = []
+        for direction, data in messages:
+            lines += [direction + line for line in data.decode('utf-8', 'replace').rstrip('\n').split('\n')]
+
+        return ('\n'.join(lines), Utilities.verdicts[verdict], outcome['solution'])
+
+    @staticmethod
+    def run_interactive(tests, execute_command, limits, interactor_source):
+        """
+        Method to compile an interactor and run the solution
+        against it on all test cases in parallel
+        """
+        import multiprocessing
+        from terminaltables import AsciiTable
+
+        extension = interactor_source.split('.')[-1]
+        interactor = interactor_source[:-len(extension) - 1]
+        interactor_path = os.path.join(os.getcwd(), interactor)
+        interactor_basename = interactor.split('/')[-1]
+
+        if not os.path.isfile(interactor_source) or extension not in Utilities.languages:
+            print('ERROR : Interactor should be an existing C, C++, Python, Java or Kotlin source')
+            sys.exit(0)
+
+        compiler, interactor_command = Utilities.get_commands(extension, interactor_basename)
+        if compiler is not None:
+            if extension in ['c', 'cpp']:
+                compiler = Utilities.precompile_header(compiler)
+            if os.system(compiler + ' \'' + interactor_path + '.' + extension + '\'') != 0:
+                print(Utilities.colors['BOLD'] + Utilities.colors['RED'] + 'Compilation error in interactor' + Utilities.colors['ENDC'] + '.')
+                sys.exit(0)
+
+        runs = Utilities.parallel_map(
+            lambda i: Utilities.run_command_on_one_interactive_test(
+                tests, i, execute_command, interactor_command, limits),
+            range(len(tests)), multiprocessing.cpu_count())
+
+        table_data = [['Serial No', 'Input', 'Transcript', 'Time', 'Result']]
+        for i, (transcript, result, stats) in enumerate(runs):
+            lines = transcript.split('\n')
+            if len(lines) > 20:
+                lines = lines[:10] + ['... %d more lines ...' % (len(lines) - 20)] + lines[-10:]
+            with open(tests[i][0], 'r') as handler:
+                table_data.append([i + 1, handler.read(), '\n'.join(lines), '%.3fs' % (stats['wall']), result])
+
+        print(AsciiTable(table_data).table)
+
+    @staticmethod
+    def get_commands(extension, basename):
+        """
+        Method to get the compile and execute commands
+        for a source file of the given extension
+        """
+        compiler = {
+            'hs': 'ghc --make -O -dynamic -o ' + basename,
+            'py': None,
+            'rb': None,
+            'c': 'gcc -static -DONLINE_JUDGE -fno-asm -lm -s -O2 -o ' + basename,
+            'cpp': 'clang++ -DONLINE_JUDGE -include /home/igorjan/206round/bits.h -O2 -std=c++17 -o ' + basename,
+            'java': 'javac -d .',
+            'kt': 'kotlinc -d .'
+        }[extension]
+        execute_command = {
+            'py': 'python ' + basename + '.' + extension,
+            'rb': 'ruby ' + basename + '.' + extension,
+            'hs': './' + basename,
+            'c': './' + basename,
+            'cpp': './' + basename,
+            'java': 'java -DONLINE_JUDGE=true -Duser.language=en -Duser.region=US -Duser.variant=US ' + basename,
+            'kt': 'kotlin -DONLINE_JUDGE=true -Duser.language=en -Duser.region=US -Duser.variant=US ' + basename + 'Kt'
+        }[extension]
+        return compiler, execute_command
+
+    @staticmethod
+    def find_executable(name):
+        """
+        Utility method to get the full path of an executable from PATH
+        """
+        for directory in os.environ.get('PATH', '').split(os.pathsep):
+            path = os.path.join(directory, name)
+            if os.path.isfile(path) and os.access(path, os.X_OK):
+                return os.path.realpath(path)
+        return None
+
+    @staticmethod
+    def precompile_header(compiler):
+        """
+        Method to replace a header force-included by a C/C++ compile
+        command with a precompiled one. The precompiled header is cached
+        per compiler, flags and header contents and rebuilt only when
+        one of them changes. Returns the command unchanged if there is
+        nothing to precompile or the build fails
+        """
+        import hashlib
+        import shlex
+        import threading
+        try:
+            from shlex import quote
+        except ImportError:
+            from pipes import quote
+
+        tokens = shlex.split(compiler)
+        if '-include' not in tokens[:-1]:
+            return compiler
+
+        position = tokens.index('-include')
+        header = tokens[position + 1]
+        executable = Utilities.find_executable(tokens[0])
+        if executable is None or not os.path.isfile(header):
+            return compiler
+
+        # Flags the header has to be built with, without output, include,
+        # linker flags and input files
+        flags = []
+        skip = False
+        for i, token in enumerate(tokens[1:], 1):
+            if skip:
+                skip = False
+            elif token in ['-o', '-include']:
+                skip = True
+            elif token in Utilities.options_with_argument:
+                flags += [token, tokens[i + 1]] if i + 1 < len(tokens) else [token]
+                skip = True
+            elif token.startswith('-') and not token.startswith('-l') and token not in ['-s', '-static']:
+                flags.append(token)
+
+        key = hashlib.sha1()
+        key.update(('%s %d\n%s\n' % (executable, os.stat(executable).st_mtime, ' '.join(flags))).encode('utf-8'))
+        key.update(Utilities.hash_file(header).encode('utf-8'))
+
+        pch_dir = os.path.join(Utilities.cache_dir, 'pch', key.hexdigest())
+        pch_header = os.path.join(pch_dir, os.path.basename(header))
+        is_clang = 'clang' in os.path.basename(executable)
+        pch_file = pch_header + ('.pch' if is_clang else '.gch')
+
+        if not os.path.isfile(pch_file):
+            print('Building precompiled header for ' + header + '...')
+            Utilities.makedirs(pch_dir)
+            with open(header, 'rb') as f:
+                Utilities.write_file(pch_header, f.read())
+            temp_file = '%s.%d.%d.tmp' % (pch_file, os.getpid(), threading.current_thread().ident)
+            build = ' '.join(quote(token) for token in [tokens[0]] + flags +
+                             ['-x', 'c++-header' if tokens[0].endswith('++') else 'c-header',
+                              pch_header, '-o', temp_file])
+            if os.system(build) != 0:
+                if os.path.isfile(temp_file):
+                    os.remove(temp_file)
+                return compiler
+            os.rename(temp_file, pch_file)
+
+        if is_clang:
+            tokens[position:position + 2] = ['-include-pch', pch_file]
+        else:
+            tokens[position + 1] = pch_header
+        return ' '.join(quote(token) for token in tokens)
+
+    @staticmethod
+    def parallel_map(function, items, workers):
+        """
+        Utility method to apply a function to all items using a
+        number of OS threads. multiprocessing.pool is not used since
+        its queues stop working once grequests monkey patches them
+        """
+        import threading
+
+        items = list(items)
+        results = [None] * len(items)
+        lock = threading.Lock()
+        position = [0]
+
+        def worker():
+            while True:
+                with lock:
+                    index = position[0]
+                    position[0] += 1
+                if index >= len(items):
+                    return
+                results[index] = function(items[index])
+
+        threads = [threading.Thread(target=worker) for _ in xrange(max(1, min(workers, len(items))))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        return results
+
+    @staticmethod
+    def get_matrix(extension):
+        """
+        Method to get the toolchain configurations to
+        compare for a source file of the given extension
+        """
+        matrix = Utilities.get_constants().get('matrix', {})
+        return matrix.get(extension, Utilities.matrix.get(extension, []))
+
+    @staticmethod
+    def run_matrix(tests, problem_path, basename, extension, limits):
+        """
+        Method to build the solution under every configured toolchain,
+        run all test cases under each of them and compare the timings
+        """
+        from shutil import rmtree
+        from terminaltables import AsciiTable
+
+        num_cases = len(tests)
+        configs = Utilities.get_matrix(extension)
+        if len(configs) == 0:
+            print('No toolchain configurations for .%s files.' % (extension))
+            sys.exit(0)
+
+        def missing_program(command):
+            # Programs started by name, the first word of each step
+            for step in re.split(r'&&|\|\||;', command or ''):
+                words = step.split()
+                if words and '/' not in words[0] and Utilities.find_executable(words[0]) is None:
+                    return words[0]
+            return None
+
+        def run_config(index):
+            config = configs[index]
+            names = {
+                'source': '\'' + problem_path + '.' + extension + '\'',
+                'binary': basename + '_matrix' + str(index),
+                'basename': basename,
+            }
+            missing = missing_program(config.get('compiler')) or missing_program(config['execute'].format(**names))
+            if missing:
+                return missing + ' not found'
+
+            if config.get('compiler'):
+                compiler = config['compiler'].format(**names)
+                if extension in ['c', 'cpp']:
+                    compiler = Utilities.precompile_header(compiler)
+                with open(os.devnull, 'w') as devnull:
+                    pid = Utilities.spawn(compiler, stdout=devnull.fileno(), stderr=devnull.fileno())
+                    compile_status = Utilities.get_status(os.wait4(pid, 0)[1])
+                if compile_status != 0:
+                    return 'CE'
+
+            execute_command = config['execute'].format(**names)
+            runs = [Utilities.run_command_on_one_test(tests, i, execute_command, limits, 'temp_output_matrix%d_' % (index))
+                    for i in xrange(num_cases)]
+            # The shell could not find the program, e.g. a pyenv shim
+            # of a version that is not installed
+            if num_cases > 0 and all(run[3]['status'] == 127 for run in runs):
+                return 'not installed'
+            return runs
+
+        outcomes = Utilities.parallel_map(run_config, range(len(configs)), len(configs))
+
+        rows = []
+        for index, config in enumerate(configs):
+            # Clean up per configuration artifacts
+            for i in xrange(num_cases):
+                output_file = 'temp_output_matrix%d_%d' % (index, i)
+                if os.path.isfile(output_file):
+                    os.remove(output_file)
+            binary = basename + '_matrix' + str(index)
+            if os.path.isdir(binary):
+                rmtree(binary)
+            elif os.path.isfile(binary):
+                os.remove(binary)
+
+            outcome = outcomes[index]
+            # Failed to build or a program it needs is not installed
+            if not isinstance(outcome, list):
+                rows.append([config['name'], None, 0.0, 0.0, outcome])
+                continue
+            accepted = len([1 for result in outcome if 'AC' in result[2]])
+            times = [result[3]['wall'] for result in outcome]
+            rows.append([config['name'], accepted, sum(times), max(times) if times else 0.0, None])
+
+        # Most accepted tests first, fastest on top
+        rows.sort(key=lambda row: (row[1] is None, -(row[1] or 0), row[2]))
+
+        table_data = [['Configuration', 'Result', 'Total time', 'Max time']]
+        for name, accepted, total, longest, failure in rows:
+            if failure:
+                table_data.append([name, Utilities.colors['RED'] + failure + Utilities.colors['ENDC'], 'N/A', 'N/A'])
+            else:
+                table_data.append([name, '%d/%d AC' % (accepted, num_cases),
+                                   '%.3fs' % (total), '%.3fs' % (longest)])
+
+        print(AsciiTable(table_data).table)
+
+        if rows[0][1] == num_cases:
+            print('Fastest configuration : ' + Utilities.colors['BOLD'] + rows[0][0] + Utilities.colors['ENDC'])
+
+    @staticmethod
+    def summarize(values):
+        """
+        Method to get min, median, 95th percentile and
+        standard deviation of a list of timings
+        """
+        values = sorted(values)
+        n = len(values)
+        mean = sum(values) / n
+        median = values[n // 2] if n % 2 else (values[n // 2 - 1] + values[n // 2]) / 2
+        p95 = values[max(0, -(-95 * n // 100) - 1)]
+        stddev = (sum((v - mean) ** 2 for v in values) / (n - 1)) ** 0.5 if n > 1 else 0.0
+        return {'min': values[0], 'median': median, 'p95': p95, 'stddev': stddev}
+
+    @staticmethod
+    def run_benchmark(tests, execute_command, limits, args):
+        """
+        Method to run every test case several times after warmup
+        and report timing statistics for each of them
+        """
+        from terminaltables import AsciiTable
+
+        if args['pin'] is not None:
+            execute_command = 'taskset -c %d %s' % (args['pin'], execute_command)
+
+        limit = limits['time']
+        table_data = [['Serial No', 'Result', 'Wall min/median/p95/stddev',
+                       'CPU min/median/p95/stddev', 'Limit']]
+        fmt = '%.3f / %.3f / %.3f / %.3f'
+
+        for i in xrange(len(tests)):
+            for _ in xrange(args['warmup']):
+                Utilities.run_command_on_one_test(tests, i, execute_command, limits)
+
+            runs = [Utilities.run_command_on_one_test(tests, i, execute_command, limits)
+                    for _ in xrange(args['repeat'])]
+            failed = [result for _, _, result, _ in runs if 'AC' not in result]
+            wall = Utilities.summarize([stats['wall'] for _, _, _, stats in runs])
+            cpu = Utilities.summarize([stats['cpu'] for _, _, _, stats in runs])
+
+            usage = max(wall['median'], cpu['median']) / limit
+            if usage > args['limit_fraction']:
+                flag = Utilities.colors['BOLD'] + Utilities.colors['YELLOW'] + '%d%%' % (
+                    usage * 100) + Utilities.colors['ENDC']
+            else:
+                flag = '%d%%' % (usage * 100)
+
+            table_data.append([
+                i + 1,
+                failed[0] if failed else Utilities.verdicts['AC'],
+                fmt % (wall['min'], wall['median'], wall['p95'], wall['stddev']),
+                fmt % (cpu['min'], cpu['median'], cpu['p95'], cpu['stddev']),
+                flag
+            ])
+
+        print(AsciiTable(table_data).table)
+        print('%d runs per test after %d warmup run(s), time limit %.2fs' % (
+            args['repeat'], args['warmup'], limit))
+
+    @staticmethod
+    def record_history(testcases_path, tests, source_file, runs):
+        """
+        Method to store per test timings of a solution in the
+        problem's history and warn if it got slower than before
+        """
+        history_path = os.path.join(testcases_path, 'history.json')
+        version = Utilities.hash_file(source_file)
+        with Utilities.locked(history_path):
+            history = Utilities.read_json(history_path, {})
+
+            # Tests skipped by --fail-fast keep their earlier timings
+            timings = history.get(version, {}).get('tests', {})
+            for i, run in enumerate(runs):
+                if run is None:
+                    continue
+                _, _, result, stats = run
+                timings[os.path.basename(tests[i][0])] = {
+                    'time': stats['wall'],
+                    'memory': stats['memory'],
+                    'verdict': re.sub(r'\x1b\[[0-9;]*m', '', result),
+                }
+
+            history[version] = {
+                'source': os.path.basename(source_file),
+                'updated': int(time.time()),
+                'tests': timings,
+            }
+            Utilities.write_json(history_path, history)
+
+        # Compare against the best other version on the tests both have run
+        best = None
+        for other, entry in history.items():
+            if other == version:
+                continue
+            common = [test for test in timings if test in entry['tests']]
+            if len(common) == 0:
+                continue
+            total = sum(entry['tests'][test]['time'] for test in common)
+            current = sum(timings[test]['time'] for test in common)
+            if best is None or total < best[0]:
+                best = (total, current, entry)
+
+        if best is not None:
+            total, current, entry = best
+            if current > total * (1 + Utilities.regression_threshold) and current - total > 0.05:
+                print(Utilities.colors['BOLD'] + Utilities.colors['YELLOW'] + 'WARNING' + Utilities.colors['ENDC'] +
+                      ' : This version takes %.3fs, %d%% slower than %.3fs of a previous version (%s, %s)' % (
+                          current, (current / total - 1) * 100, total, entry['source'],
+                          time.strftime('%Y-%m-%d %H:%M', time.localtime(entry['updated']))))
+
+    @staticmethod
+    def get_test_order(testcases_path, tests):
+        """
+        Method to order tests so that the ones failed by the last
+        solution run against them go first, then the slowest ones
+        """
+        history = Utilities.read_json(os.path.join(testcases_path, 'history.json'), {})
+        last_run, slowest = {}, {}
+        for entry in history.values():
+            for test, timing in entry['tests'].items():
+                if test not in last_run or entry['updated'] > last_run[test][0]:
+                    last_run[test] = (entry['updated'], timing['verdict'] != 'AC')
+                slowest[test] = max(slowest.get(test, 0), timing['time'])
+
+        def priority(i):
+            test = os.path.basename(tests[i][0])
+            return (not last_run.get(test, (0, False))[1], -slowest.get(test, 0), i)
+
+        return sorted(xrange(len(tests)), key=priority)
+
+    @staticmethod
+    def show_history(args):
+        """
+        Method to show the timing history of all versions
+        of solutions run against a given problem
+        """
+        from terminaltables import AsciiTable
+
+        contest_code = '' if args['site'] == 'spoj' else args['contest']
+        testcases_path = os.path.join(Utilities.cache_dir, args['site'], contest_code, args['problem'])
+        history = Utilities.read_json(os.path.join(testcases_path, 'history.json'), {})
+
+        if len(history) == 0:
+            print('No runs recorded for this problem yet.')
+            return
+
+        table_data = [['Version', 'Date', 'Source', 'Passed', 'Total time', 'Max time', 'Max memory']]
+        for version, entry in sorted(history.items(), key=lambda item: item[1]['updated']):
+            tests = list(entry['tests'].values())
+            times = [test['time'] for test in tests]
+            table_data.append([
+                version[:8],
+                time.strftime('%Y-%m-%d %H:%M', time.localtime(entry['updated'])),
+                entry['source'],
+                '%d/%d' % (len([1 for test in tests if test['verdict'] == 'AC']), len(tests)),
+                '%.3fs' % (sum(times)),
+                '%.3fs' % (max(times) if times else 0.0),
+                '%.1fMB' % (max([test['memory'] for test in tests] or [0]) / 1024.0),
+            ])
+
+        print(AsciiTable(table_data).table)
+
+    @staticmethod
+    def start_compilation(problem_path, extension, basename):
+        """
+        Method to start compiling the user's solution in the background,
+        building its precompiled header first if needed. Returns the pid
+        of the compiler, None if nothing needs to be compiled, and the
+        command to execute the solution with
+        """
+        compiler, execute_command = Utilities.get_commands(extension, basename)
+        if compiler is None:
+            return None, execute_command
+        source = ' \'' + problem_path + '.' + extension + '\''
+        if extension in ['c', 'cpp']:
+            pid = Utilities.spawn(compiler, prepare=lambda command: Utilities.precompile_header(command) + source)
+        else:
+            pid = Utilities.spawn(compiler + source)
+        return pid, execute_command
+
+    @staticmethod
+    def stop_compilation(compilation):
+        """
+        Method to kill a compilation started by start_compilation
+        and everything it started, and reap it
+        """
+        pid = compilation[0] if compilation else None
+        if pid is None:
+            return
+        try:
+            os.killpg(pid, signal.SIGKILL)
+        except OSError:
+            pass
+        os.waitpid(pid, 0)
 
     @staticmethod
-    def run_solution(args):
+    def run_solution(args, compilation=None):
         """
-        Method to run and test the user's solution against sample cases
+        Method to run and test the user's solution against sample cases.
+        A compilation started while the test cases were downloaded
+        can be passed on as returned by start_compilation
         """
         problem = args['source']
 
@@ -362,44 +2159,56 @@ class Utilities:
                                       'site'], contest_code, problem_code)
 
         if os.path.isdir(testcases_path):
-            num_cases = Utilities.getTestCasesCount(testcases_path)
+            tests = Utilities.get_tests(testcases_path)
+            num_cases = len(tests)
             results, expected_outputs, user_outputs = [''] * num_cases, [''] * num_cases, [''] * num_cases
 
-            if extension in ['c', 'cpp', 'java', 'py', 'hs', 'rb', 'kt']:
-
-                compiler = {
-                    'hs': 'ghc --make -O -dynamic -o ' + basename,
-                    'py': None,
-                    'rb': None,
-                    'c': 'gcc -static -DONLINE_JUDGE -fno-asm -lm -s -O2 -o ' + basename,
-                    'cpp': 'clang++ -DONLINE_JUDGE -include /home/igorjan/206round/bits.h -O2 -std=c++17 -o ' + basename,
-                    'java': 'javac -d .',
-                    'kt': 'kotlinc -d .'
-                }[extension]
-                execute_command = {
-                    'py': 'python ' + basename + '.' + extension,
-                    'rb': 'ruby ' + basename + '.' + extension,
-                    'hs': './' + basename,
-                    'c': './' + basename,
-                    'cpp': './' + basename,
-                    'java': 'java -DONLINE_JUDGE=true -Duser.language=en -Duser.region=US -Duser.variant=US ' + basename,
-                    'kt': 'kotlin -DONLINE_JUDGE=true -Duser.language=en -Duser.region=US -Duser.variant=US ' + basename + 'Kt'
-                }[extension]
-                if compiler is None:
-                    compile_status = 0
-                else:
-                    compile_status = os.system(compiler + ' \'' + problem_path + '.' + extension + '\'')
+            if extension in Utilities.languages:
+
+                limits = Utilities.get_limits(testcases_path, extension, args)
+
+                if args['matrix']:
+                    Utilities.run_matrix(tests, problem_path, basename, extension, limits)
+                    return
+
+                if compilation is None:
+                    compilation = Utilities.start_compilation(problem_path, extension, basename)
+                pid, execute_command = compilation
+                compile_status = 0 if pid is None else Utilities.get_status(os.wait4(pid, 0)[1])
 
                 if compile_status == 0:
 
                     # Compiled successfully
+                    if args['interactor']:
+                        Utilities.run_interactive(tests, execute_command, limits, args['interactor'])
+                        Utilities.cleanup(num_cases, basename, extension)
+                        return
+
+                    if args['repeat']:
+                        Utilities.run_benchmark(tests, execute_command, limits, args)
+                        Utilities.cleanup(num_cases, basename, extension)
+                        return
+
+                    artifact = None if args['rerun'] else Utilities.hash_artifact(problem_path, extension, basename)
+                    runs = [None] * num_cases
+                    reused = 0
+                    for i in Utilities.get_test_order(testcases_path, tests):
+                        runs[i], was_reused = Utilities.run_memoized(tests, i, execute_command, limits, artifact)
+                        reused += was_reused
+                        expected_outputs[i], user_outputs[i], results[i], _ = runs[i]
+                        if args['fail_fast'] and results[i] != Utilities.verdicts['AC']:
+                            break
+
                     for i in xrange(num_cases):
-                        expected_outputs[i], user_outputs[i], results[i] = Utilities.run_command_on_one_test(testcases_path, i, execute_command)
+                        if runs[i] is None:
+                            with open(tests[i][1], 'r') as out_handler:
+                                expected_outputs[i] = out_handler.read().strip()
+                            results[i] = Utilities.verdicts['SKIP']
                 else:
                     # Compilation error occurred
                     message = Utilities.colors['BOLD'] + Utilities.colors[
                         'RED'] + 'Compilation error. Not run against test cases' + Utilities.colors['ENDC'] + '.'
-                    prin((message))
+                    print(message)
                     sys.exit(0)
 
             else:
@@ -410,7 +2219,7 @@ class Utilities:
             table_data = [['Serial No', 'Input',
                            'Expected Output', 'Your Output', 'Result']]
 
-            inputs = Utilities.input_file_to_string(testcases_path, num_cases)
+            inputs = Utilities.input_file_to_string(tests)
 
             for i in xrange(num_cases):
 
@@ -429,6 +2238,12 @@ class Utilities:
 
             print(table.table)
 
+            if reused > 0:
+                print('Reused the results of %d tests from earlier runs of the same binary. '
+                      'Use --rerun to run them again.' % (reused))
+
+            Utilities.record_history(testcases_path, tests, problem_path + '.' + extension, runs)
+
             # Clean up temporary files
             Utilities.cleanup(num_cases, basename, extension)
 
@@ -439,10 +2254,138 @@ class Utilities:
             args['force'] = True
             args['source'] = problem + '.' + extension
 
-            Utilities.download_problem_testcases(args)
+            # Compile while the test cases are being downloaded
+            compilation = None
+            if extension in Utilities.languages and not args['matrix']:
+                compilation = Utilities.start_compilation(problem_path, extension, basename)
+
+            try:
+                Utilities.download_problem_testcases(args)
+            except:
+                # Do not leave the compiler running if the download fails
+                Utilities.stop_compilation(compilation)
+                raise
 
             print('Running your solution against sample cases...')
-            Utilities.run_solution(args)
+            Utilities.run_solution(args, compilation)
+
+    @staticmethod
+    def get_session():
+        """
+        Utility method to get a requests session shared by all
+        requests of a run, so connections are kept alive
+        """
+        if Utilities.session is None:
+            Utilities.session = rq.Session()
+            adapter = rq.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=Utilities.max_connections)
+            Utilities.session.mount('https://', adapter)
+            Utilities.session.mount('http://', adapter)
+        return Utilities.session
+
+    @staticmethod
+    def get_site_url(site, default):
+        """
+        Utility method to get the base url of a site, which can be
+        overridden with the 'urls' key in constants.json
+        """
+        return Utilities.get_constants().get('urls', {}).get(site, default).rstrip('/')
+
+    @staticmethod
+    def parse_start_time(text):
+        """
+        Utility method to get a unix timestamp from a time given as
+        a timestamp, 'HH:MM[:SS]' today or 'YYYY-MM-DD HH:MM[:SS]'
+        """
+        if re.match(r'^\d+(\.\d+)?$', text):
+            return float(text)
+        for fmt in ['%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M', '%H:%M:%S', '%H:%M']:
+            try:
+                parsed = time.strptime(text, fmt)
+            except ValueError:
+                continue
+            if not fmt.startswith('%Y'):
+                today = time.localtime()
+                parsed = time.struct_time((today.tm_year, today.tm_mon, today.tm_mday) + tuple(parsed)[3:6] + (0, 0, -1))
+            return time.mktime(parsed)
+        print('Could not understand start time ' + text)
+        sys.exit(0)
+
+    @staticmethod
+    def wait_and_fetch(args):
+        """
+        Method to wait for a contest to start and download all its
+        problems as soon as they are visible. Connections are opened
+        ahead of the start, then the contest is polled with a
+        jittered backoff until its problems show up
+        """
+        import random
+
+        platform = Utilities.get_platform(args)
+        if not hasattr(platform, 'poll_contest'):
+            print('Waiting for a contest is not supported for ' + args['site'] + '.')
+            sys.exit(0)
+        Utilities.check_cache(platform.site, platform.contest, None)
+
+        if args['start_time']:
+            start = Utilities.parse_start_time(args['start_time'])
+        else:
+            try:
+                start = platform.get_start_time()
+            except Exception:
+                start = None
+        if start is None:
+            print('Could not find the start time of the contest. Specify it with --start-time.')
+            sys.exit(0)
+
+        print('Contest starts at ' + time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(start)) + '...')
+
+        # Sleep until shortly before the start, keeping the connection warm
+        offset = 0.0
+        while start - (time.time() + offset) > Utilities.warm_up_lead:
+            time.sleep(min(start - (time.time() + offset) - Utilities.warm_up_lead, 60))
+            offset = Utilities.warm_up(platform.url)
+
+        offset = Utilities.warm_up(platform.url)
+        if start - (time.time() + offset) > 0:
+            time.sleep(max(0, start - (time.time() + offset) - 0.2))
+
+        delay = 0.25
+        while True:
+            try:
+                if platform.poll_contest():
+                    break
+                reason = 'problems are not visible yet'
+            except SystemExit:
+                reason = 'download failed'
+            except Exception as e:
+                reason = str(e) or e.__class__.__name__
+
+            if time.time() + offset - start > Utilities.wait_timeout:
+                print('Contest did not open within %d minutes of its start (%s). Giving up.' % (
+                    Utilities.wait_timeout // 60, reason))
+                sys.exit(0)
+
+            wait = delay * random.uniform(0.5, 1.5)
+            print('Contest not open, %s. Retrying in %.1fs...' % (reason, wait))
+            time.sleep(wait)
+            delay = min(delay * 1.5, 5)
+
+        print('Done in %.2fs after the start.' % (time.time() + offset - start))
+
+    @staticmethod
+    def warm_up(url):
+        """
+        Method to open a connection to a site ahead of time. Returns
+        the difference between the clock of the site and the local one
+        """
+        import calendar
+        from email.utils import parsedate
+
+        try:
+            r = Utilities.get_session().head(url + '/', timeout=10)
+            return calendar.timegm(parsedate(r.headers['Date'])) - time.time()
+        except Exception:
+            return 0.0
 
     @staticmethod
     def get_html(url):
@@ -452,7 +2395,7 @@ class Utilities:
         MAX_TRIES = 3
         try:
             for try_count in range(MAX_TRIES):
-                r = rq.get(url)
+                r = Utilities.get_session().get(url)
                 if r.status_code == 200:
                     break
             if try_count >= MAX_TRIES:
@@ -474,7 +2417,7 @@ class Codeforces:
         self.contest = args['contest']
         self.problem = args['problem']
         self.force_download = args['force']
-        self.url = 'https://codeforces.com'
+        self.url = Utilities.get_site_url(self.site, 'https://codeforces.com')
         self.locale = 'locale=ru'
 
     def parse_html(self, req):
@@ -483,16 +2426,28 @@ class Codeforces:
         from a codeforces problem
         """
         soup = bs(req.text, 'html.parser')
+        parsed = self.parse_statement(soup)
 
+        if parsed is None:
+            print('Problem not found...')
+            Utilities.handle_kbd_interrupt(
+                self.site, self.contest, self.problem)
+            sys.exit(0)
+
+        return parsed
+
+    def parse_statement(self, soup):
+        """
+        Method to get test cases, statement and limits from
+        the part of a page holding a single codeforces problem.
+        Returns None if there are no sample tests in it
+        """
         inputs = soup.findAll('div', {'class': 'input'})
         outputs = soup.findAll('div', {'class': 'output'})
         statements = soup.findAll('div', {'class': 'problem-statement'})
 
         if len(inputs) == 0 or len(outputs) == 0:
-            print('Problem not found...')
-            Utilities.handle_kbd_interrupt(
-                self.site, self.contest, self.problem)
-            sys.exit(0)
+            return None
 
         tags = ('<br>', '\n'), ('<br/>', '\n'), ('</br>', ''), ('</p>', '\n'), ('<p>', '\n'), ('<div>', '\n'), ('</div>', '\n'), ('<li>', '\n *')
         htmls = [('$$$', ''),
@@ -521,11 +2476,17 @@ class Codeforces:
         formatted_outputs = list(map(getContent, outputs))
         formatted_text = [getContent(statements[0], True)]
 
+        time_limit = soup.find('div', {'class': 'time-limit'})
+        memory_limit = soup.find('div', {'class': 'memory-limit'})
+        limits = Utilities.parse_limits(
+            time_limit.get_text() if time_limit else None,
+            memory_limit.get_text() if memory_limit else None)
+
         # print('Inputs', ''.join(formatted_inputs))
         # print('Outputs', ''.join(formatted_outputs))
         # print('Statements', ''.join(formatted_text))
 
-        return formatted_inputs, formatted_outputs, ''.join(formatted_text)
+        return formatted_inputs, formatted_outputs, ''.join(formatted_text), limits
 
     def get_problem_links(self, req):
         """
@@ -546,22 +2507,76 @@ class Codeforces:
 
         return links
 
+    def get_start_time(self):
+        """
+        Method to get the start time of the contest from the codeforces api
+        """
+        gym = 'true' if int(self.contest) > 100000 else 'false'
+        req = Utilities.get_session().get('%s/api/contest.list?gym=%s' % (self.url, gym), timeout=30)
+        for contest in req.json()['result']:
+            if str(contest['id']) == self.contest:
+                return contest.get('startTimeSeconds')
+        return None
+
+    def poll_contest(self):
+        """
+        Method to download all problems of the contest if they
+        are visible already. Returns False if they are not
+        """
+        type = 'contest' if int(self.contest) <= 100000 else 'gym'
+        url = '%s/%s/%s/problems?%s' % (self.url, type, self.contest, self.locale)
+        req = Utilities.get_session().get(url, timeout=10)
+        return req.status_code == 200 and self.store_problems_page(req)
+
+    def store_problems_page(self, req):
+        """
+        Method to split the page with all statements of a
+        codeforces contest into problems and store each of them.
+        Returns False if the page has no problems in it
+        """
+        soup = bs(req.text, 'html.parser')
+        holders = soup.findAll('div', {'class': 'problemindexholder'})
+
+        if len(holders) == 0:
+            return False
+
+        print('Found %d problems..' % (len(holders)))
+
+        cached_problems = os.listdir(os.path.join(
+            Utilities.cache_dir, self.site, self.contest))
+
+        for holder in holders:
+            self.problem = holder['problemindex']
+            if not self.force_download and self.problem in cached_problems:
+                continue
+
+            parsed = self.parse_statement(holder)
+            if parsed is None:
+                print('No sample tests found for problem ' + self.problem + '...')
+                continue
+
+            inputs, outputs, text, limits = parsed
+            Utilities.check_cache(self.site, self.contest, self.problem)
+            Utilities.store_files(self.site, self.contest, self.problem, inputs, outputs, text, limits)
+
+        return True
+
     def handle_batch_requests(self, links):
         """
         Method to send simultaneous requests to
-        all problem pages
+        all problem pages over a shared pool of connections
         """
-        rs = (grq.get(link) for link in links)
-        responses = grq.map(rs)
+        rs = (grq.get(link, session=Utilities.get_session()) for link in links)
+        responses = grq.map(rs, size=Utilities.max_connections)
 
         failed_requests = []
 
         for response in responses:
             if response is not None and response.status_code == 200:
-                inputs, outputs, text = self.parse_html(response)
+                inputs, outputs, text, limits = self.parse_html(response)
                 self.problem = response.url.split('/')[-1].split('?')[0]
                 Utilities.check_cache(self.site, self.contest, self.problem)
-                Utilities.store_files(self.site, self.contest, self.problem, inputs, outputs, text)
+                Utilities.store_files(self.site, self.contest, self.problem, inputs, outputs, text, limits)
             else:
                 failed_requests += [response.url]
 
@@ -575,16 +2590,24 @@ class Codeforces:
         type = 'contest' if int(self.contest) <= 100000 else 'gym'
         url = '%s/%s/%s/problem/%s?%s' % (self.url, type, self.contest, self.problem, self.locale)
         req = Utilities.get_html(url)
-        inputs, outputs, text = self.parse_html(req)
-        Utilities.store_files(self.site, self.contest, self.problem, inputs, outputs, text)
+        inputs, outputs, text, limits = self.parse_html(req)
+        Utilities.store_files(self.site, self.contest, self.problem, inputs, outputs, text, limits)
         print('Done.')
 
     def scrape_contest(self):
         """
-        Method to scrape all problems from a given codeforces contest
+        Method to scrape all problems from a given codeforces contest.
+        All statements are fetched at once from the contest's
+        problems page, falling back to one request per problem
         """
         print('Checking problems available for contest ' + self.contest + '...')
         type = 'contest' if int(self.contest) <= 100000 else 'gym'
+
+        url = '%s/%s/%s/problems?%s' % (self.url, type, self.contest, self.locale)
+        req = Utilities.get_html(url)
+        if self.store_problems_page(req):
+            return
+
         url = '%s/%s/%s?%s' % (self.url, type, self.contest, self.locale)
         req = Utilities.get_html(url)
         links = self.get_problem_links(req)
@@ -612,6 +2635,8 @@ class Codechef:
         self.contest = args['contest']
         self.problem = args['problem']
         self.force_download = args['force']
+        self.max_connections = Utilities.max_connections
+        self.url = Utilities.get_site_url(self.site, 'https://codechef.com')
 
     def parse_html(self, req):
         """
@@ -653,54 +2678,72 @@ class Codechef:
             formatted_inputs += [inp.strip()]
             formatted_outputs += [out.strip()]
 
+        limits = Utilities.parse_limits(str(data.get('max_timelimit', '')), None)
+
         # print('Inputs', formatted_inputs)
         # print('Outputs', formatted_outputs)
 
-        return formatted_inputs, formatted_outputs
+        return formatted_inputs, formatted_outputs, limits
 
     def get_problem_links(self, req):
         """
         Method to get the links for the problems
-        in a given codechef contest
+        in a given codechef contest from the contest api
         """
-        soup = bs(req.text, 'html.parser')
-
-        table = soup.find('table', {'class': 'dataTable'})
+        try:
+            data = json.loads(req.text)
+            problems = data['problems']
+        except (KeyError, ValueError):
+            problems = None
 
-        if table is None:
+        if not problems:
             print('Contest not found...')
             Utilities.handle_kbd_interrupt(
                 self.site, self.contest, self.problem)
             sys.exit(0)
 
-        links = [div.find('a')['href']
-                 for div in table.findAll('div', {'class': 'problemname'})]
-        links = ['https://codechef.com/api/contests/' + self.contest +
-                 '/problems/' + link.split('/')[-1] for link in links]
+        links = [self.url + '/api/contests/' + self.contest +
+                 '/problems/' + code for code in sorted(problems)]
 
         return links
 
+    def get_start_time(self):
+        """
+        Method to get the start time of the contest from the codechef api
+        """
+        req = Utilities.get_session().get(self.url + '/api/contests/' + self.contest, timeout=30)
+        return req.json().get('time', {}).get('start')
+
+    def poll_contest(self):
+        """
+        Method to download all problems of the contest if they
+        are visible already. Returns False if they are not
+        """
+        req = Utilities.get_session().get(self.url + '/api/contests/' + self.contest, timeout=10)
+        if req.status_code != 200 or not req.json().get('problems'):
+            return False
+        failed_requests = self.handle_batch_requests(self.get_problem_links(req))
+        if len(failed_requests) > 0:
+            self.handle_batch_requests(failed_requests)
+        return True
+
     def handle_batch_requests(self, links):
         """
         Method to send simultaneous requests to
-        all problem pages
+        all problem pages over a shared pool of connections
         """
-        rs = (grq.get(link) for link in links)
-        responses = grq.map(rs)
-
-        # responses = []
-        # for link in links:
-        #     responses += [rq.get(link)]
+        rs = (grq.get(link, session=Utilities.get_session()) for link in links)
+        responses = grq.map(rs, size=self.max_connections)
 
         failed_requests = []
 
         for response in responses:
             if response is not None and response.status_code == 200:
-                inputs, outputs = self.parse_html(response)
+                inputs, outputs, limits = self.parse_html(response)
                 self.problem = response.url.split('/')[-1]
                 Utilities.check_cache(self.site, self.contest, self.problem)
                 Utilities.store_files(
-                    self.site, self.contest, self.problem, inputs, outputs)
+                    self.site, self.contest, self.problem, inputs, outputs, limits=limits)
             else:
                 failed_requests += [response.url]
 
@@ -711,12 +2754,12 @@ class Codechef:
         Method to scrape a single problem from codechef
         """
         print('Fetching problem ' + self.contest + '-' + self.problem + ' from Codechef...')
-        url = 'https://codechef.com/api/contests/' + \
+        url = self.url + '/api/contests/' + \
             self.contest + '/problems/' + self.problem
         req = Utilities.get_html(url)
-        inputs, outputs = self.parse_html(req)
+        inputs, outputs, limits = self.parse_html(req)
         Utilities.store_files(self.site, self.contest,
-                              self.problem, inputs, outputs)
+                              self.problem, inputs, outputs, limits=limits)
         print('Done.')
 
     def scrape_contest(self):
@@ -724,7 +2767,7 @@ class Codechef:
         Method to scrape all problems from a given codechef contest
         """
         print('Checking problems available for contest ' + self.contest + '...')
-        url = 'https://codechef.com/' + self.contest
+        url = self.url + '/api/contests/' + self.contest
         req = Utilities.get_html(url)
         links = self.get_problem_links(req)
 
@@ -792,10 +2835,17 @@ class Spoj:
             formatted_inputs += [inp.strip()]
             formatted_outputs += [out.strip()]
 
+        text = soup.get_text()
+        time_limit = re.search(r'Time limit:\s*([\d.]+\s*s)', text)
+        memory_limit = re.search(r'Memory limit:\s*([\d.]+\s*[KMG]B)', text)
+        limits = Utilities.parse_limits(
+            time_limit.group(1) if time_limit else None,
+            memory_limit.group(1) if memory_limit else None)
+
         # print('Inputs', formatted_inputs)
         # print('Outputs', formatted_outputs)
 
-        return formatted_inputs, formatted_outputs
+        return formatted_inputs, formatted_outputs, limits
 
     def scrape_problem(self):
         """
@@ -804,9 +2854,9 @@ class Spoj:
         print('Fetching problem ' + self.problem + ' from SPOJ...')
         url = 'http://spoj.com/problems/' + self.problem
         req = Utilities.get_html(url)
-        inputs, outputs = self.parse_html(req)
+        inputs, outputs, limits = self.parse_html(req)
         Utilities.store_files(self.site, self.contest,
-                              self.problem, inputs, outputs)
+                              self.problem, inputs, outputs, limits=limits)
         print('Done.')
 
 
@@ -821,6 +2871,7 @@ class Hackerrank:
         self.problem = '-'.join(args['problem'].split()
                                 ).lower() if args['problem'] is not None else None
         self.force_download = args['force']
+        self.url = Utilities.get_site_url(self.site, 'https://www.hackerrank.com')
 
     def parse_html(self, req):
         """
@@ -892,7 +2943,7 @@ class Hackerrank:
                 self.site, self.contest, self.problem)
             sys.exit(0)
 
-        links = ['https://www.hackerrank.com/rest/contests/' + self.contest +
+        links = [self.url + '/rest/contests/' + self.contest +
                  '/challenges/' + problem['slug'] for problem in data]
 
         return links
@@ -900,10 +2951,10 @@ class Hackerrank:
     def handle_batch_requests(self, links):
         """
         Method to send simultaneous requests to
-        all problem pages
+        all problem pages over a shared pool of connections
         """
-        rs = (grq.get(link) for link in links)
-        responses = grq.map(rs)
+        rs = (grq.get(link, session=Utilities.get_session()) for link in links)
+        responses = grq.map(rs, size=Utilities.max_connections)
 
         failed_requests = []
 
@@ -919,12 +2970,32 @@ class Hackerrank:
 
         return failed_requests
 
+    def get_start_time(self):
+        """
+        Method to get the start time of the contest from the hackerrank api
+        """
+        req = Utilities.get_session().get(self.url + '/rest/contests/' + self.contest, timeout=30)
+        return req.json()['model'].get('epoch_starttime')
+
+    def poll_contest(self):
+        """
+        Method to download all problems of the contest if they
+        are visible already. Returns False if they are not
+        """
+        req = Utilities.get_session().get(self.url + '/rest/contests/' + self.contest + '/challenges', timeout=10)
+        if req.status_code != 200 or not req.json().get('models'):
+            return False
+        failed_requests = self.handle_batch_requests(self.get_problem_links(req))
+        if len(failed_requests) > 0:
+            self.handle_batch_requests(failed_requests)
+        return True
+
     def scrape_problem(self):
         """
         Method to scrape a single problem from hackerrank
         """
         print('Fetching problem ' + self.contest + '-' + self.problem + ' from Hackerrank...')
-        url = 'https://www.hackerrank.com/rest/contests/' + \
+        url = self.url + '/rest/contests/' + \
             self.contest + '/challenges/' + self.problem
         req = Utilities.get_html(url)
         inputs, outputs = self.parse_html(req)
@@ -937,7 +3008,7 @@ class Hackerrank:
         Method to scrape all problems from a given hackerrank contest
         """
         print('Checking problems available for contest ' + self.contest + '...')
-        url = 'https://www.hackerrank.com/rest/contests/' + self.contest + '/challenges'
+        url = self.url + '/rest/contests/' + self.contest + '/challenges'
         req = Utilities.get_html(url)
         links = self.get_problem_links(req)
 
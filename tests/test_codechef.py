@@ -0,0 +1,121 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from acedit.util import Utilities
+from gevent.pywsgi import WSGIServer
+
+fixtures = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'codechef')
+
+
+class CodechefContestTest(unittest.TestCase):
+    """
+    Downloads a contest recorded in tests/fixtures/codechef from a
+    local server standing in for codechef.com and checks the cache
+    """
+
+    contest = 'COOK82'
+
+    def setUp(self):
+        self.cache_dir = Utilities.cache_dir
+        Utilities.cache_dir = tempfile.mkdtemp()
+        Utilities.session = None
+        self.requests = []
+
+        self.server = WSGIServer(('127.0.0.1', 0), self.application, log=None)
+        self.server.start()
+        Utilities.write_json(os.path.join(Utilities.cache_dir, 'constants.json'), {
+            'urls': {'codechef': 'http://127.0.0.1:%d' % self.server.server_port},
+        })
+
+        with open(os.path.join(fixtures, 'expected.json')) as f:
+            self.expected = json.load(f)
+
+    def tearDown(self):
+        self.server.stop()
+        shutil.rmtree(Utilities.cache_dir)
+        Utilities.cache_dir = self.cache_dir
+        Utilities.session = None
+
+    def application(self, environ, start_response):
+        path = environ['PATH_INFO']
+        self.requests.append((path, environ['REMOTE_PORT']))
+
+        prefix = '/api/contests/' + self.contest
+        if path == prefix:
+            fixture = os.path.join(fixtures, 'contest.json')
+        elif path.startswith(prefix + '/problems/'):
+            fixture = os.path.join(fixtures, 'problems', os.path.basename(path) + '.json')
+        else:
+            fixture = None
+
+        if fixture is None or not os.path.isfile(fixture):
+            start_response('404 Not Found', [('Content-Length', '0')])
+            return [b'']
+
+        with open(fixture, 'rb') as f:
+            body = f.read()
+        start_response('200 OK', [('Content-Type', 'application/json'),
+                                  ('Content-Length', str(len(body)))])
+        return [body]
+
+    def download(self):
+        Utilities.download_contest_testcases({
+            'site': 'codechef', 'contest': self.contest, 'problem': None, 'force': True,
+        })
+
+    def read_cache(self):
+        cached = {}
+        for site, contest, problem in Utilities.get_problem_dirs('codechef', self.contest):
+            problem_path = os.path.join(Utilities.cache_dir, site, contest, problem)
+            tests = []
+            for input_path, output_path in Utilities.get_tests(problem_path):
+                with open(input_path) as input_file, open(output_path) as output_file:
+                    tests.append([input_file.read(), output_file.read()])
+            cached[problem] = {
+                'tests': tests,
+                'limits': Utilities.read_json(os.path.join(problem_path, 'limits.json')),
+            }
+        return cached
+
+    def test_contest_is_cached_as_recorded(self):
+        self.download()
+        self.assertEqual(self.read_cache(), self.expected)
+
+    def test_test_files_are_stored_by_content(self):
+        self.download()
+        for problem in self.expected:
+            problem_path = os.path.join(Utilities.cache_dir, 'codechef', self.contest, problem)
+            for test in Utilities.read_json(os.path.join(problem_path, 'tests.json')):
+                for digest in [test['input'], test['output']]:
+                    self.assertEqual(Utilities.hash_file(Utilities.get_object_path(digest)), digest)
+
+    def test_download_again_gives_identical_cache(self):
+        self.download()
+        first = self.read_cache()
+        self.download()
+        self.assertEqual(self.read_cache(), first)
+
+    def test_problem_download_matches_contest_download(self):
+        self.download()
+        contest = self.read_cache()
+        shutil.rmtree(os.path.join(Utilities.cache_dir, 'codechef'))
+
+        for problem in self.expected:
+            Utilities.download_problem_testcases({
+                'site': 'codechef', 'contest': self.contest, 'problem': problem, 'force': True,
+            })
+        self.assertEqual(self.read_cache(), contest)
+
+    def test_connections_are_shared_by_the_whole_download(self):
+        self.download()
+        contest_port = self.requests[0][1]
+        problem_ports = [port for path, port in self.requests[1:]]
+        self.assertEqual(len(problem_ports), len(self.expected))
+        self.assertIn(contest_port, problem_ports)
+
+
+if __name__ == '__main__':
+    unittest.main()
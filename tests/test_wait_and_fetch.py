@@ -0,0 +1,114 @@
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from acedit.util import Utilities
+from gevent.pywsgi import WSGIServer
+
+fixtures = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'codechef')
+
+
+class WaitAndFetchTest(unittest.TestCase):
+    """
+    Waits for a contest served by a local server standing in for
+    codechef.com, which lists no problems until it opens
+    """
+
+    contest = 'COOK82'
+
+    def setUp(self):
+        self.cache_dir = Utilities.cache_dir
+        self.wait_timeout = Utilities.wait_timeout
+        Utilities.cache_dir = tempfile.mkdtemp()
+        Utilities.session = None
+        self.opens_at = None
+        self.polls = []
+
+        self.server = WSGIServer(('127.0.0.1', 0), self.application, log=None)
+        self.server.start()
+        Utilities.write_json(os.path.join(Utilities.cache_dir, 'constants.json'), {
+            'urls': {'codechef': 'http://127.0.0.1:%d' % self.server.server_port},
+        })
+
+        with open(os.path.join(fixtures, 'expected.json')) as f:
+            self.expected = json.load(f)
+
+    def tearDown(self):
+        self.server.stop()
+        shutil.rmtree(Utilities.cache_dir)
+        Utilities.cache_dir = self.cache_dir
+        Utilities.wait_timeout = self.wait_timeout
+        Utilities.session = None
+
+    def is_open(self):
+        return self.opens_at is not None and time.time() >= self.opens_at
+
+    def application(self, environ, start_response):
+        path = environ['PATH_INFO']
+
+        prefix = '/api/contests/' + self.contest
+        if path == prefix:
+            self.polls.append((time.time(), self.is_open()))
+            with open(os.path.join(fixtures, 'contest.json')) as f:
+                contest = json.load(f)
+            if not self.is_open():
+                contest['problems'] = []
+            body = json.dumps(contest).encode('utf-8')
+        elif path.startswith(prefix + '/problems/') and self.is_open():
+            fixture = os.path.join(fixtures, 'problems', os.path.basename(path) + '.json')
+            with open(fixture, 'rb') as f:
+                body = f.read()
+        else:
+            start_response('404 Not Found', [('Content-Length', '0')])
+            return [b'']
+
+        start_response('200 OK', [('Content-Type', 'application/json'),
+                                  ('Content-Length', str(len(body)))])
+        return [body]
+
+    def wait(self, start):
+        Utilities.wait_and_fetch({
+            'site': 'codechef', 'contest': self.contest, 'problem': None, 'force': True,
+            'start_time': '%.3f' % (start),
+        })
+
+    def cached_problems(self):
+        return sorted(problem for site, contest, problem in Utilities.get_problem_dirs('codechef', self.contest))
+
+    def test_problems_are_fetched_once_the_contest_opens(self):
+        start = time.time() + 1
+        # The problems show up a little after the announced start
+        self.opens_at = start + 1
+        self.wait(start)
+
+        self.assertEqual(self.cached_problems(), sorted(self.expected))
+        for problem in self.expected:
+            problem_path = os.path.join(Utilities.cache_dir, 'codechef', self.contest, problem)
+            self.assertEqual(len(Utilities.get_tests(problem_path)), len(self.expected[problem]['tests']))
+
+        # Polled until the contest opened, and not once more after
+        self.assertTrue(len(self.polls) > 1)
+        self.assertEqual([opened for at, opened in self.polls], [False] * (len(self.polls) - 1) + [True])
+        # Not polled before it was about to start
+        self.assertTrue(self.polls[0][0] >= start - 0.5)
+
+    def test_waiting_gives_up_after_the_timeout(self):
+        Utilities.wait_timeout = 1
+        start = time.time()
+        self.assertRaises(SystemExit, self.wait, start)
+
+        self.assertEqual(self.cached_problems(), [])
+        self.assertTrue(len(self.polls) > 1)
+        self.assertTrue(Utilities.wait_timeout <= time.time() - start < 10)
+
+        # Nothing polls the contest once waiting stopped
+        polls = len(self.polls)
+        time.sleep(0.5)
+        self.assertEqual(len(self.polls), polls)
+
+
+if __name__ == '__main__':
+    unittest.main()